@@ -1,6 +1,9 @@
 from collections import Counter
+from functools import lru_cache
 import random
 
+import numpy as np
+
 
 class Agent:
     def __init__(self, preference, honest, number_of_votes_cast):
@@ -44,6 +47,88 @@ class Voting:
         else:
             return min(1, (1 / 2) + cost * (state["A"] - state["B"]))
 
+GRID_CELLS = 2**22     # largest table of every vote combination that fnp2_pa_grid keeps; beyond it the differences are indexed
+
+@lru_cache(maxsize=64)
+def fnp2_pa_by_difference(max_votes, cost):
+    '''
+    FNP-2 probability of selecting A for every vote difference A - B in [-max_votes, max_votes],
+    for states in which neither alternative is unanimous (the same values Voting.find_FNP2_PA gives)
+    :return: a read-only array whose entry max_votes + (A - B) holds P(A)
+    '''
+    difference = np.arange(-max_votes, max_votes + 1)
+    pa = np.where(difference >= 0, np.minimum(1, 0.5 + cost * difference), 1 - np.minimum(1, 0.5 - cost * difference))
+    pa.flags.writeable = False
+    return pa
+
+@lru_cache(maxsize=8)
+def fnp2_pa_grid(max_votes, cost):
+    '''
+    FNP-2 probability of selecting A for every combination of 0 to max_votes votes for A and for B, including the
+    unanimous states; only meant for (max_votes + 1)**2 up to GRID_CELLS
+    :return: a read-only array whose entry [A, B] holds P(A)
+    '''
+    votes = np.arange(max_votes + 1)
+    grid = fnp2_pa_by_difference(max_votes, cost)[votes[:, None] - votes[None, :] + max_votes]
+    grid[0, 1:] = 0         # unanimous states select their alternative for sure
+    grid[1:, 0] = 1
+    grid.flags.writeable = False
+    return grid
+
+def fnp2_pa(votes_a, votes_b, cost):
+    '''
+    FNP-2 probability of selecting A, element-wise over arrays of vote counts
+    :return: an array of the broadcast shape of votes_a and votes_b
+    '''
+    votes_a, votes_b = np.asarray(votes_a, dtype=np.int64), np.asarray(votes_b, dtype=np.int64)
+    max_votes = int(max(votes_a.max(initial=0), votes_b.max(initial=0)))
+    pa = fnp2_pa_by_difference(max_votes, float(cost))[votes_a - votes_b + max_votes]
+    pa = np.where((votes_a == 0) & (votes_b > 0), 0.0, pa)
+    return np.where((votes_a > 0) & (votes_b == 0), 1.0, pa)
+
+def fnp2_pa_table(votes_a, votes_b, costs, dtype=np.float64):
+    '''
+    FNP-2 probability of selecting A for every combination of vote counts and costs at once
+    :return: an array of shape (len(costs), len(votes_a), len(votes_b)), cell [k, i, j] holding
+             Voting.find_FNP2_PA({"A": votes_a[i], "B": votes_b[j]}, costs[k])
+    '''
+    votes_a, votes_b = np.asarray(votes_a, dtype=np.int64), np.asarray(votes_b, dtype=np.int64)
+    costs = np.atleast_1d(costs)
+    max_votes = int(max(votes_a.max(initial=0), votes_b.max(initial=0)))
+    table = np.empty((costs.size, votes_a.size, votes_b.size), dtype=dtype)
+    if (max_votes + 1)**2 <= GRID_CELLS:   # look every cell up in the memoized grid
+        for k, cost in enumerate(costs):
+            table[k] = fnp2_pa_grid(max_votes, float(cost))[np.ix_(votes_a, votes_b)]
+        return table
+    rows_per_chunk = max(1, 2**22 // max(votes_b.size, 1))      # bounds the size of the index array
+    for start in range(0, votes_a.size, rows_per_chunk):
+        rows = slice(start, start + rows_per_chunk)
+        index = votes_a[rows, None] - votes_b[None, :] + max_votes
+        for k, cost in enumerate(costs):
+            table[k, rows] = fnp2_pa_by_difference(max_votes, float(cost))[index]
+    # unanimous states select their alternative for sure
+    table[:, np.flatnonzero(votes_a == 0)[:, None], np.flatnonzero(votes_b > 0)[None, :]] = 0
+    table[:, np.flatnonzero(votes_a > 0)[:, None], np.flatnonzero(votes_b == 0)[None, :]] = 1
+    return table
+
+def majority_pa_table(votes_a, votes_b):
+    '''
+    probability of selecting A under the majority rule (ties go to B, as in Voting.find_majority_outcome)
+    :return: an array of shape (len(votes_a), len(votes_b))
+    '''
+    return (np.asarray(votes_a)[:, None] > np.asarray(votes_b)[None, :]).astype(np.float64)
+
+def unanimity_pa_table(votes_a, votes_b):
+    '''
+    probability of selecting A under the unanimity rule, which chooses randomly unless one alternative is unanimous
+    :return: an array of shape (len(votes_a), len(votes_b))
+    '''
+    votes_a, votes_b = np.asarray(votes_a)[:, None], np.asarray(votes_b)[None, :]
+    table = np.full((votes_a.size, votes_b.size), 0.5)
+    table[(votes_b > 0) & (votes_a == 0)] = 0
+    table[(votes_a > 0) & (votes_b == 0)] = 1
+    return table
+
 def get_list_of_agents(num_agents):
     '''
     insert specification on sybil behaviour here
@@ -65,6 +150,62 @@ def get_list_of_agents(num_agents):
 
     return list_of_agents
 
+def sample_states(num_populations, num_agents, rng):
+    '''
+    samples populations like get_list_of_agents and tallies them like find_state, for many populations at once
+    preferences are coded 0 for A and 1 for B; dishonest agents cast 1 to 5 votes
+    :return: the true and the sybil number of votes for A and for B, one entry per population
+    '''
+    prefers_a = rng.integers(0, 2, size=(num_populations, num_agents)) == 0
+    honest = rng.integers(0, 2, size=(num_populations, num_agents)) == 1
+    number_of_votes_cast = np.where(honest, 1, rng.integers(1, 6, size=(num_populations, num_agents)))
+    true_a = prefers_a.sum(axis=1)
+    sybil_a = (number_of_votes_cast * prefers_a).sum(axis=1)
+    return true_a, num_agents - true_a, sybil_a, number_of_votes_cast.sum(axis=1) - sybil_a
+
+def unanimity_outcomes(votes_a, votes_b, rng, uniforms=None):
+    '''
+    the unanimity rule over arrays of vote counts, choosing randomly wherever there is no unanimity
+    pass the same uniforms to compare two states under one and the same random choice
+    :return: a boolean array, True where A is selected
+    '''
+    uniforms = uniforms if uniforms is not None else rng.random(size=np.shape(votes_a))
+    random_choice = uniforms < 0.5
+    return np.where((votes_a > 0) & (votes_b == 0), True, np.where((votes_b > 0) & (votes_a == 0), False, random_choice))
+
+def fnp2_outcomes(votes_a, votes_b, cost, rng, uniforms=None):
+    '''
+    the FNP-2 lottery over arrays of vote counts, drawing A with probability fnp2_pa (like Network.fnp2_picks)
+    pass the same uniforms to compare two states under one and the same lottery draw
+    :return: a boolean array, True where A is selected
+    '''
+    uniforms = uniforms if uniforms is not None else rng.random(size=np.shape(votes_a))
+    return uniforms < fnp2_pa(votes_a, votes_b, cost)
+
+def simulate_flip_rates(num_agents, costs, num_populations, rng=None, chunk_size=2**22):
+    '''
+    estimates how often sybil votes change the outcome of the majority, unanimity and FNP-2 rules, compared to
+    every agent casting a single vote; populations are sampled in chunks of about chunk_size agents
+    the true and the sybil state of a population share one uniform, so a random rule only flips where the sybil votes
+    move its probability of selecting A past that uniform; the flip rate of FNP-2 then is E|P(A | true) - P(A | sybil)|
+    :return: a dict mapping "majority", "unanimity" and "FNP2" to arrays of shape (len(num_agents), len(costs)),
+             holding the fraction of populations whose outcome flipped
+    '''
+    rng = rng if rng is not None else np.random.default_rng()
+    num_agents, costs = np.atleast_1d(num_agents), np.atleast_1d(costs)
+    flips = {rule: np.zeros((num_agents.size, costs.size)) for rule in ("majority", "unanimity", "FNP2")}
+    for i, n in enumerate(num_agents):
+        populations_per_chunk = max(1, chunk_size // int(n))
+        for start in range(0, num_populations, populations_per_chunk):
+            size = min(populations_per_chunk, num_populations - start)
+            true_a, true_b, sybil_a, sybil_b = sample_states(size, int(n), rng)
+            uniforms = rng.random(size)         # coupled draws: one per population, for both of its states
+            flips["majority"][i] += np.sum((true_a > true_b) != (sybil_a > sybil_b))
+            flips["unanimity"][i] += np.sum(unanimity_outcomes(true_a, true_b, rng, uniforms) != unanimity_outcomes(sybil_a, sybil_b, rng, uniforms))
+            for k, cost in enumerate(costs):     # the lottery is drawn, as thresholding P(A) would reduce FNP-2 to majority
+                flips["FNP2"][i, k] += np.sum(fnp2_outcomes(true_a, true_b, cost, rng, uniforms) != fnp2_outcomes(sybil_a, sybil_b, cost, rng, uniforms))
+    return {rule: count / num_populations for rule, count in flips.items()}
+
 def find_state(list_of_agents):
     true_preference_list = []
     sybil_preference_list = []
@@ -76,35 +217,35 @@ def find_state(list_of_agents):
     return true_state, sybil_state
 
 
-'''
-parameters - cost, and number of agents
-'''
-cost = 0.15
-num_agents = 5
-replicate_con = True
-
-# create some agents:
-agents = get_list_of_agents(num_agents)
-# find the state (number of votes for each alternative A or B)
-true_state, sybil_state = find_state(agents)
-
-# replicate the Table of Connitzer
-if replicate_con:
-    print("FNP2, c = 0.15, replicating table\n")
-    for voters_B in reversed(range(0, 6)):
-        for voters_A in range(0, 6):
-            state = Counter({'A': voters_A, 'B': voters_B})
-            voting = Voting(dict(state), dict(state), cost)
-            print(format(voting.FNP2_PA, '.2f'), end="\t")
-        print("\n")
-else:
-
-    # voting takes as input the true state and the sybil state and calculates the outcome
-    voting = Voting(dict(true_state), dict(sybil_state), cost)
-    print("True Majority = {}\n"
-          "Sybil Majority = {}\n"
-          "True Unanimity = {}\n"
-          "Sybil Unanimity = {}\n"
-          "FNP2 = {} (probability A: {}, probability B: {})\n".format(voting.majority_outcome, voting.sybil_majority_outcome,
-                                                                      voting.unanimity_outcome, voting.sybil_unanimity_outcome,
-                                                                      voting.FNP2_outcome, voting.FNP2_PA, voting.FNP2_PB))
\ No newline at end of file
+
+if __name__ == '__main__':
+    '''
+    parameters - cost, and number of agents
+    '''
+    cost = 0.15
+    num_agents = 5
+    replicate_con = True
+
+    # replicate the Table of Connitzer
+    if replicate_con:
+        print("FNP2, c = 0.15, replicating table\n")
+        table = fnp2_pa_table(range(0, 6), range(0, 6), [cost])[0]
+        for voters_B in reversed(range(0, 6)):
+            for voters_A in range(0, 6):
+                print(format(table[voters_A, voters_B], '.2f'), end="\t")
+            print("\n")
+    else:
+        # create some agents:
+        agents = get_list_of_agents(num_agents)
+        # find the state (number of votes for each alternative A or B)
+        true_state, sybil_state = find_state(agents)
+
+        # voting takes as input the true state and the sybil state and calculates the outcome
+        voting = Voting(dict(true_state), dict(sybil_state), cost)
+        print("True Majority = {}\n"
+              "Sybil Majority = {}\n"
+              "True Unanimity = {}\n"
+              "Sybil Unanimity = {}\n"
+              "FNP2 = {} (probability A: {}, probability B: {})\n".format(voting.majority_outcome, voting.sybil_majority_outcome,
+                                                                          voting.unanimity_outcome, voting.sybil_unanimity_outcome,
+                                                                          voting.FNP2_outcome, voting.FNP2_PA, voting.FNP2_PB))
\ No newline at end of file
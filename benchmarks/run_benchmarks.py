@@ -0,0 +1,192 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# the project's modules use flat imports, so make each source directory importable
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in (root, os.path.join(root, 'sybil_resiliency'), os.path.join(root, 'src')):
+    sys.path.insert(0, directory)
+
+import FNP2
+from resiliencies import (Aggregation, ConsensusProtocol, Network, SybilResiliencyExperiment,
+                          sybils_win_consensus_round, sybils_win_consensus_rounds)
+from world import World
+from world_vectorized import WorldVectorized
+
+# Benchmarks for the hot paths of both simulators. Every benchmark yields one record per parameter combination,
+# holding the best and the median wall-clock time over a number of repeats. The records are written as JSON,
+# together with the commit and library versions they were measured at, so runs of different commits can be compared.
+
+# parameter grids per benchmark; --quick uses the first, smaller grids
+grids: dict = {
+    'network': ({'num_honest': (100, 10000), 'num_adversary': (1, 10)},
+                {'num_honest': (100, 1000, 10000, 100000, 1000000), 'num_adversary': (1, 10, 100)}),
+    'consensus_round': ({'num_honest': (100,), 'num_adversary': (1,), 'coalition_size': (5,)},
+                        {'num_honest': (100, 10000), 'num_adversary': (1, 10), 'coalition_size': (2, 5, 20)}),
+    'consensus_rounds': ({'num_honest': (100,), 'num_adversary': (1,), 'coalition_size': (5,)},
+                         {'num_honest': (100, 1000, 10000), 'num_adversary': (1, 10), 'coalition_size': (2, 5, 20)}),
+    'experiment': ({'num_honest': (100,), 'num_adversary': (1,), 'coalition_size': (5,)},
+                   {'num_honest': (100, 1000), 'num_adversary': (1, 10), 'coalition_size': (2, 5, 20)}),
+    'world': ({'engine': ('World', 'WorldVectorized'), 'num_agents': (1000,), 'num_adversaries': (1,)},
+              {'engine': ('World', 'WorldVectorized'), 'num_agents': (1000, 10000), 'num_adversaries': (1, 10)}),
+    'world_vectorized': ({'num_agents': (100000,), 'num_adversaries': (1,)},
+                         {'num_agents': (100000, 1000000), 'num_adversaries': (1, 10)}),
+    'fnp2': ({'num_agents': (5, 100)},
+             {'num_agents': (5, 100, 10000)}),
+}
+
+num_single_rounds: int = 100        # calls of sybils_win_consensus_round per measurement
+num_batched_rounds: int = 10000     # rounds per sybils_win_consensus_rounds call
+num_votings: int = 1000             # Voting objects per measurement
+
+def product(grid: dict) -> list:
+    combinations = [{}]
+    for name, values in grid.items():
+        combinations = [dict(combination, **{name: value}) for combination in combinations for value in values]
+    return combinations
+
+# time `function` `repeat` times after `setup`, which is not timed; returns the best and the median time in seconds
+def measure(function, repeat: int, setup=lambda: None) -> dict:
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        function(state)
+        times.append(time.perf_counter() - start)
+    return {'seconds_min': min(times), 'seconds_median': statistics.median(times), 'repeat': repeat}
+
+def bench_network(params: dict, repeat: int) -> dict:
+    rng = np.random.default_rng(0)
+    return measure(lambda _: Network(params['num_honest'], params['num_adversary'], rng=rng), repeat)
+
+def bench_consensus_round(params: dict, repeat: int) -> dict:
+    rng = np.random.default_rng(0)
+    net = Network(params['num_honest'], params['num_adversary'], rng=rng)
+    def run(_):
+        for _ in range(num_single_rounds):
+            sybils_win_consensus_round(net, params['protocol'], params['coalition_size'], rng)
+    return dict(measure(run, repeat), rounds=num_single_rounds)
+
+def bench_consensus_rounds(params: dict, repeat: int) -> dict:
+    rng = np.random.default_rng(0)
+    net = Network(params['num_honest'], params['num_adversary'], rng=rng)
+    run = lambda _: sybils_win_consensus_rounds(net, params['protocol'], num_batched_rounds, params['coalition_size'], rng)
+    return dict(measure(run, repeat), rounds=num_batched_rounds)
+
+def bench_experiment(params: dict, repeat: int) -> dict:
+    num_episodes, num_iterations = 20, 50
+    run = lambda _: SybilResiliencyExperiment(
+        params['num_honest'], params['num_adversary'], num_episodes, num_iterations, list(ConsensusProtocol),
+        coalition_size=params['coalition_size'], seed=0, aggregation=Aggregation.COUNTS)
+    return dict(measure(run, repeat), episodes=num_episodes, iterations=num_iterations)
+
+def bench_world(params: dict, repeat: int) -> dict:
+    engine = {'World': World, 'WorldVectorized': WorldVectorized}[params['engine']]
+    par = dict(engine.par, num_agents=params['num_agents'], num_adversaries=params['num_adversaries'])
+    world_class = type(engine.__name__, (engine,), {'par': par})
+    random.seed(0)
+    return dict(measure(lambda world: world.run(), repeat, setup=world_class), epochs=par['num_epochs'])
+
+def bench_world_vectorized(params: dict, repeat: int) -> dict:
+    return bench_world(dict(params, engine='WorldVectorized'), repeat)
+
+def bench_fnp2(params: dict, repeat: int) -> dict:
+    random.seed(0)
+    states = [FNP2.find_state(FNP2.get_list_of_agents(params['num_agents'])) for _ in range(num_votings)]
+    states = [({'A': 0, 'B': 0, **true}, {'A': 0, 'B': 0, **sybil}) for true, sybil in states]
+    def run(_):
+        for true_state, sybil_state in states:
+            FNP2.Voting(true_state, sybil_state, 0.15)
+    return dict(measure(run, repeat), votings=num_votings)
+
+benchmarks: dict = {
+    'network': bench_network,
+    'consensus_round': bench_consensus_round,
+    'consensus_rounds': bench_consensus_rounds,
+    'experiment': bench_experiment,
+    'world': bench_world,
+    'world_vectorized': bench_world_vectorized,
+    'fnp2': bench_fnp2,
+}
+
+# benchmarks that are measured once per consensus protocol
+per_protocol: tuple = ('consensus_round', 'consensus_rounds')
+
+def git_commit() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(('git',) + args, cwd=root, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return {'commit': git('rev-parse', 'HEAD'), 'dirty': bool(status) if status is not None else None}
+
+def environment() -> dict:
+    import pandas
+    return dict(git_commit(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                python=platform.python_version(), numpy=np.__version__, pandas=pandas.__version__,
+                platform=platform.platform(), processor=platform.processor(), cpu_count=os.cpu_count())
+
+def run(names: list, quick: bool, repeat: int) -> list:
+    records = []
+    for name in names:
+        combinations = product(grids[name][0 if quick else 1])
+        if name in per_protocol:
+            combinations = [dict(combination, protocol=protocol) for combination in combinations for protocol in ConsensusProtocol]
+        for params in combinations:
+            values = {key: value.value if isinstance(value, ConsensusProtocol) else value for key, value in params.items()}
+            try:
+                result = benchmarks[name](params, repeat)
+            except ValueError as error:     # e.g. two-alternative elections with more than one adversary
+                print('%-18s %-80s skipped: %s' % (name, json.dumps(values), error))
+                continue
+            records.append(dict(benchmark=name, params=values, **result))
+            print('%-18s %-80s %10.4f s' % (name, json.dumps(values), result['seconds_min']))
+    return records
+
+# print the ratio of the best times of the records both results have in common
+def compare(records: list, baseline_path: str):
+    with open(baseline_path) as fp:
+        baseline = {(record['benchmark'], json.dumps(record['params'], sort_keys=True)): record
+                    for record in json.load(fp)['records']}
+    print('\nspeedup relative to %s:' % baseline_path)
+    for record in records:
+        key = (record['benchmark'], json.dumps(record['params'], sort_keys=True))
+        if key in baseline:
+            print('%-18s %-80s %8.2fx' % (key[0], key[1], baseline[key]['seconds_min'] / record['seconds_min']))
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the hot paths of the sybil resiliency and world simulators.')
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help='benchmarks to run, among %s (default: all)' % (', '.join(benchmarks),))
+    parser.add_argument('--quick', action='store_true', help='use small parameter grids')
+    parser.add_argument('--repeat', type=int, default=3, help='measurements per parameter combination')
+    parser.add_argument('--output', default=None, help='JSON file to write (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results JSON to compare against')
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(benchmarks)
+    if unknown:
+        parser.error('unknown benchmarks: %s' % (', '.join(sorted(unknown)),))
+
+    env = environment()
+    records = run(args.benchmarks or list(benchmarks), args.quick, args.repeat)
+    output = args.output or os.path.join(root, 'benchmarks', 'results', '%s.json' % ((env['commit'] or 'unknown')[:10],))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as fp:
+        json.dump({'environment': env, 'quick': args.quick, 'records': records}, fp, indent=4)
+    print('results written to %s' % (output,))
+    if args.compare:
+        compare(records, args.compare)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import os
+import random
+import sys
+
+import numpy as np
+
+# the project's modules use flat imports, so make each source directory importable
+root = os.path.dirname(os.path.abspath(__file__))
+for directory in (root, os.path.join(root, 'sybil_resiliency'), os.path.join(root, 'src')):
+    sys.path.insert(0, directory)
+
+# One entry point for the World simulation, the sybil resiliency experiments and the FNP-2 tables.
+# Every command imports its simulator when it runs; pandas and matplotlib are only imported when an output asks for them.
+
+def run_world(args):
+    from sinks import StatisticsSink
+    from world import World
+    from world_vectorized import WorldVectorized
+    engine = {'world': World, 'vectorized': WorldVectorized}[args.engine]
+    par = dict(engine.par, num_epochs=args.epochs, num_agents=args.agents, frac_sybils=args.frac_sybils,
+               num_adversaries=args.adversaries)
+    world_class = type(engine.__name__, (engine,), {'par': par})   # leave the class-wide defaults untouched
+    if args.engine == 'world':
+        random.seed(args.seed)
+        world = world_class()
+    else:
+        world = world_class(np.random.default_rng(args.seed))
+    statistics = StatisticsSink()
+    world.run(sinks=[statistics], keep_chain=args.save is not None)
+    print('blocks %d, transactions %d, volume %.2f, mean amount %.4f (variance %.4f)'
+          % (statistics.num_blocks, statistics.num_transactions, statistics.volume, statistics.mean_amount,
+             statistics.variance_amount))
+    for protocol in world.sybil_wins:
+        print('sybils won %.3f of the blocks under %s' % (world.sybil_win_rate(protocol), protocol))
+    if args.save is not None:
+        world.save(args.save)
+        print('run written to %s' % (args.save,))
+
+def run_resiliency(args):
+    from resiliencies import Aggregation, ConsensusProtocol, Network, SybilResiliencyExperiment
+    from cache import ResultCache
+    protocols = tuple(ConsensusProtocol(value) for value in args.protocols) if args.protocols else tuple(ConsensusProtocol)
+    experiment = SybilResiliencyExperiment(
+        args.honest, args.adversaries, args.episodes, args.iterations, protocols,
+        coalition_size=args.coalition_size, seed=args.seed, workers=args.workers,
+        cost=args.cost if args.cost is not None else Network.COST, aggregation=Aggregation(args.aggregation),
+        exact=args.exact, common_random_numbers=args.crn,
+        cache=ResultCache(args.cache_dir) if args.cache_dir is not None else None)
+    for protocol, mean in zip(protocols, experiment.wins.mean()):
+        print('%-10s %.4f' % (protocol.value, mean))
+    if args.output is not None:
+        experiment.save(args.output, args.file_name)    # imports pandas
+        print('results written to %s' % (experiment.results_path(args.output, args.file_name),))
+
+def run_fnp2(args):
+    import FNP2
+    votes = np.arange(args.max_votes + 1)
+    table = FNP2.fnp2_pa_table(votes, votes, args.costs)
+    for cost, cost_table in zip(args.costs, table):
+        print('FNP2, c = %s, probability of picking A (rows: votes for B, descending; columns: votes for A)\n' % (cost,))
+        for votes_b in reversed(votes):
+            print('\t'.join(format(cost_table[votes_a, votes_b], '.2f') for votes_a in votes))
+        print()
+    if args.output is not None:
+        np.save(args.output, table)
+        print('table written to %s' % (args.output,))
+    if args.flip_rates:
+        num_agents = np.arange(1, args.max_votes + 1)
+        rates = FNP2.simulate_flip_rates(num_agents, args.costs, args.populations, np.random.default_rng(args.seed))
+        for rule, rule_rates in rates.items():
+            print('%-10s flip rate per cost, averaged over 1 to %d agents: %s'
+                  % (rule, args.max_votes, ', '.join('%.4f' % (rate,) for rate in rule_rates.mean(axis=0))))
+    if args.plot is not None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        figure, axes = plt.subplots(1, len(args.costs), figsize=(4 * len(args.costs), 4), squeeze=False)
+        for ax, cost, cost_table in zip(axes[0], args.costs, table):
+            image = ax.imshow(cost_table.T, origin='lower', vmin=0.0, vmax=1.0)
+            ax.set(title='c = %s' % (cost,), xlabel='votes for A', ylabel='votes for B')
+        figure.colorbar(image, ax=axes[0].tolist())
+        figure.savefig(args.plot)
+        print('plot written to %s' % (args.plot,))
+
+def parser() -> argparse.ArgumentParser:
+    main_parser = argparse.ArgumentParser(description='Run the world simulation, sybil resiliency experiments or FNP-2 tables.')
+    commands = main_parser.add_subparsers(dest='command', required=True)
+
+    world = commands.add_parser('world', help='simulate an economy of donating agents')
+    world.add_argument('--engine', choices=('world', 'vectorized'), default='vectorized')
+    world.add_argument('--epochs', type=int, default=100)
+    world.add_argument('--agents', type=int, default=1000)
+    world.add_argument('--frac-sybils', type=float, default=0.1)
+    world.add_argument('--adversaries', type=int, default=1)
+    world.add_argument('--seed', type=int, default=None)
+    world.add_argument('--save', default=None, help='directory to write the run to')
+    world.set_defaults(handler=run_world)
+
+    resiliency = commands.add_parser('resiliency', help='estimate how often sybils win consensus per protocol')
+    resiliency.add_argument('--honest', type=int, default=100)
+    resiliency.add_argument('--adversaries', type=int, default=1)
+    resiliency.add_argument('--episodes', type=int, default=50)
+    resiliency.add_argument('--iterations', type=int, default=100)
+    resiliency.add_argument('--protocols', nargs='*', default=None, help='protocol values, such as pow or fnp2 (default: all)')
+    resiliency.add_argument('--coalition-size', type=int, default=5)
+    resiliency.add_argument('--seed', type=int, default=None)
+    resiliency.add_argument('--workers', type=int, default=None)
+    resiliency.add_argument('--cost', type=float, default=None, help='per-vote cost of FNP-2')
+    resiliency.add_argument('--aggregation', choices=('trace', 'packed', 'counts', 'moments'), default='counts')
+    resiliency.add_argument('--exact', action='store_true', help='use closed-form win probabilities where available')
+    resiliency.add_argument('--crn', action='store_true', help='let the protocols share their randomness')
+    resiliency.add_argument('--cache-dir', default=None, help='directory of the result cache (requires --seed)')
+    resiliency.add_argument('--output', default=None, help='directory to write the results to as CSV')
+    resiliency.add_argument('--file-name', default='syb_res_exp')
+    resiliency.set_defaults(handler=run_resiliency)
+
+    fnp2 = commands.add_parser('fnp2', help='tabulate the FNP-2 probability of picking A')
+    fnp2.add_argument('--costs', type=float, nargs='+', default=[0.15])
+    fnp2.add_argument('--max-votes', type=int, default=5)
+    fnp2.add_argument('--output', default=None, help='.npy file to write the tables to')
+    fnp2.add_argument('--flip-rates', action='store_true', help='also simulate how often each rule is overturned')
+    fnp2.add_argument('--populations', type=int, default=10000, help='populations per agent count for --flip-rates')
+    fnp2.add_argument('--seed', type=int, default=None)
+    fnp2.add_argument('--plot', default=None, help='image file to plot the tables to')
+    fnp2.set_defaults(handler=run_fnp2)
+    return main_parser
+
+def main():
+    args = parser().parse_args()
+    if args.command == 'resiliency' and args.protocols:
+        from network import ConsensusProtocol
+        unknown = set(args.protocols) - {protocol.value for protocol in ConsensusProtocol}
+        if unknown:
+            parser().error('unknown protocols: %s' % (', '.join(sorted(unknown)),))
+    args.handler(args)
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,8 @@ class Agent:
     def __init__(self):
         rnd_dev = self.par['init_balance_deviation']                                          
         self.balance: float = self.par['init_balance'] + random.uniform(-rnd_dev, rnd_dev)    # initialize balance
+        self.index: int = None                                                                  # position in the world, assigned by World
+        self.world = None                                                                       # the world the agent lives in, assigned by World
     
     # evaluate the probability that an agent engages in a donation
     # True means trade, False means don't trade
@@ -36,10 +38,12 @@ class Agent:
         max_don = min(self.balance, self.balance * self.par['max_frac_donated'])    # maximum amount donated
         return random.uniform(min_don, max_don)
         
-    # agent donates to another agent
+    # agent donates to another agent, keeping the world's stakes in step
     def donate(self, donation_recipient, amount):
         self.balance -= amount
         donation_recipient.balance += amount
+        if self.world is not None:
+            self.world.stake.update((self.index, donation_recipient.index), (-amount, amount))
 
 
     
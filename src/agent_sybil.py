@@ -2,5 +2,6 @@ from agent import Agent
 
 class AgentSybil(Agent):
 
-    def __init__(self):
+    def __init__(self, adversary: int = None):
         Agent.__init__(self)
+        self.adversary: int = adversary     # index of the adversary that owns this sybil, assigned by World
@@ -1,23 +1,75 @@
-from typing import NewType
-from agent import Agent
+from typing import Tuple
 
-Transaction = NewType('Transaction', (Agent(), Agent(), float))    # source, destination, amount
+import numpy as np
+
+from ledger import Ledger
+
+Transaction = Tuple[int, int, float]    # source, destination, amount; agents are referred to by index
 
 class Block:
     """
     Each epoch is associated with one block.
     Each block stores the transactions between between users.
+    A new block buffers its own transactions; once added to a blockchain it becomes a view on the chain's ledger.
     """
 
     def __init__(self):
-        self.transactions = []              # each block is initialized as empty list
+        self.ledger: Ledger = None          # each block is initialized as empty; its buffer is created on first use
+        self.index: int = None              # position in the ledger, set once the block is sealed
+
+    # bind the block to a ledger which holds its transactions as block `index`
+    def attach(self, ledger: Ledger, index: int):
+        self.ledger, self.index = ledger, index
+
+    def _range(self) -> tuple:
+        if self.ledger is None:
+            return 0, 0
+        if self.index is None:
+            return 0, self.ledger.get_num_transactions()
+        return self.ledger.block_range(self.index)
+
+    def _column(self, name: str):
+        if self.ledger is None:
+            return np.empty(0, dtype=np.float64 if name == 'amounts' else np.int64)
+        start, stop = self._range()
+        return getattr(self.ledger, name)[start:stop]
+
+    # columns of the block's transactions
+    @property
+    def sources(self):
+        return self._column('sources')
+
+    @property
+    def destinations(self):
+        return self._column('destinations')
+
+    @property
+    def amounts(self):
+        return self._column('amounts')
+
+    # the transactions as (source, destination, amount) tuples
+    @property
+    def transactions(self) -> list:
+        return list(zip(self.sources.tolist(), self.destinations.tolist(), self.amounts.tolist()))
 
     def get_num_transactions(self):
-        return len(self.transactions)
+        start, stop = self._range()
+        return stop - start
 
     # append a single transaction to the block
+    # source and destination may be given as agents, which are stored by their index
     def add_transaction(self, transaction: Transaction):
-        self.transactions.append(transaction)
+        source, destination, amount = transaction
+        source, destination = getattr(source, 'index', source), getattr(destination, 'index', destination)
+        self.add_transactions((source,), (destination,), (amount,))
+
+    # append many transactions at once, given as parallel sequences of sources, destinations and amounts
+    def add_transactions(self, sources, destinations, amounts):
+        if self.index is not None:
+            raise ValueError('Block %d is already part of a blockchain.' % self.index)
+        if self.ledger is None:
+            self.ledger = Ledger()
+        self.ledger.append(sources, destinations, amounts)
 
     def __str__(self):
-        return str(self.transactions)
\ No newline at end of file
+        return str(self.transactions)
@@ -1,22 +1,66 @@
+import numpy as np
+
 from block import Block
+from ledger import Ledger, LedgerIndex
 
 class Blockchain:
     '''The blockchain constains the history of transactions as a series of Blocks.'''
 
-    def  __init__(self):
-        self.blocks: list = []
+    # initial_balances, indexed by agent, are needed for point-in-time balance queries
+    def  __init__(self, initial_balances: np.ndarray = None):
+        self.ledger: Ledger = Ledger()      # columnar storage of all transactions on the chain
+        self.blocks: list = []              # views on the ledger, one per block
+        self.initial_balances = initial_balances
+        self.index: LedgerIndex = LedgerIndex(self.ledger)   # per-agent transaction history, built on the first query
+        self._volume: float = 0.0           # running total of all transferred amounts, None until summed
+
+    # build a blockchain on top of an existing ledger, e.g. one loaded from disk
+    # the ledger is not read here: the index and the volume are computed when first asked for
+    @classmethod
+    def from_ledger(cls, ledger: Ledger, initial_balances: np.ndarray = None) -> 'Blockchain':
+        blockchain = cls(initial_balances)
+        blockchain.ledger = ledger
+        blockchain.index = LedgerIndex(ledger)
+        blockchain._volume = None
+        for index in range(ledger.get_num_blocks()):
+            block = Block()
+            block.attach(ledger, index)
+            blockchain.blocks.append(block)
+        return blockchain
+
+    # total of all transferred amounts
+    @property
+    def volume(self) -> float:
+        if self._volume is None:
+            self._volume = float(self.ledger.amounts.sum())
+        return self._volume
 
     # return the number of blocks on the blockchain
     def get_num_blocks(self):
-        return len(self.blocks)
+        return self.ledger.get_num_blocks()
 
-    # return the number of transations on the blockchain by summing over blocks
+    # return the number of transations on the blockchain
     def get_num_transaction(self):
-        return sum([block.get_num_transactions() for block in self.blocks])
+        return self.ledger.get_num_transactions()
 
     # add a block to the blockchain after each epoch
+    # its transactions are moved into the chain's ledger and the block becomes a view on them
     def add_block(self, block: Block):
+        self.ledger.append(block.sources, block.destinations, block.amounts)
+        block.attach(self.ledger, self.ledger.seal_block())
         self.blocks.append(block)
+        if self._volume is not None:
+            self._volume += float(block.amounts.sum())
+
+    # ledger offsets of an agent's transactions; outgoing=True or False selects one direction only
+    def get_agent_transactions(self, agent: int, outgoing: bool = None) -> np.ndarray:
+        return self.index.transactions_of(agent, outgoing)
+
+    # balance of an agent at the end of epoch `epoch`, i.e. after block `epoch` was applied
+    def get_balance_at(self, agent: int, epoch: int) -> float:
+        initial = float(self.initial_balances[agent]) if self.initial_balances is not None else 0.0
+        _, stop = self.ledger.block_range(epoch)
+        return initial + self.index.balance_change_before(agent, stop)
     
     def __str__(self):
         return str([str(block) for block in self.blocks])
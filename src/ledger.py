@@ -0,0 +1,169 @@
+import numpy as np
+
+class Ledger:
+    '''
+    Columnar storage of transactions: one growable array each for source index, destination index and amount.
+    Transactions are grouped into blocks, which are delimited by offsets into the columns.
+    '''
+
+    init_capacity: int = 1024              # initial number of transactions the columns can hold
+
+    def __init__(self):
+        self._sources = np.empty(self.init_capacity, dtype=np.int64)
+        self._destinations = np.empty(self.init_capacity, dtype=np.int64)
+        self._amounts = np.empty(self.init_capacity, dtype=np.float64)
+        self._num_transactions: int = 0
+        self._block_offsets = np.zeros(self.init_capacity, dtype=np.int64)   # block i spans offsets i to i+1
+        self._num_blocks: int = 0
+
+    # wrap existing columns, e.g. memory-mapped ones; they are only copied if more transactions are appended
+    @classmethod
+    def from_columns(cls, sources, destinations, amounts, block_offsets) -> 'Ledger':
+        ledger = cls.__new__(cls)
+        ledger._sources, ledger._destinations, ledger._amounts = sources, destinations, amounts
+        ledger._num_transactions = sources.size
+        ledger._block_offsets = block_offsets
+        ledger._num_blocks = block_offsets.size - 1
+        return ledger
+
+    # views on the filled part of each column
+    @property
+    def sources(self) -> np.ndarray:
+        return self._sources[:self._num_transactions]
+
+    @property
+    def destinations(self) -> np.ndarray:
+        return self._destinations[:self._num_transactions]
+
+    @property
+    def amounts(self) -> np.ndarray:
+        return self._amounts[:self._num_transactions]
+
+    @property
+    def block_offsets(self) -> np.ndarray:
+        return self._block_offsets[:self._num_blocks + 1]
+
+    def get_num_transactions(self) -> int:
+        return self._num_transactions
+
+    def get_num_blocks(self) -> int:
+        return self._num_blocks
+
+    # make room for at least `required` transactions, doubling the capacity so appends are amortized O(1)
+    def _reserve(self, required: int):
+        capacity = self._sources.size
+        if required <= capacity:
+            return
+        capacity = max(capacity, self.init_capacity)
+        while capacity < required:
+            capacity *= 2
+        for name in ('_sources', '_destinations', '_amounts'):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._num_transactions] = column[:self._num_transactions]
+            setattr(self, name, grown)
+
+    # append transactions to the block that is currently open
+    def append(self, sources, destinations, amounts):
+        sources = np.asarray(sources, dtype=np.int64)
+        start, stop = self._num_transactions, self._num_transactions + sources.size
+        self._reserve(stop)
+        self._sources[start:stop] = sources
+        self._destinations[start:stop] = destinations
+        self._amounts[start:stop] = amounts
+        self._num_transactions = stop
+
+    # close the open block and return its index
+    def seal_block(self) -> int:
+        if self._num_blocks + 2 > self._block_offsets.size:
+            self._block_offsets = np.concatenate((self._block_offsets, np.zeros(self._block_offsets.size, dtype=np.int64)))
+        self._num_blocks += 1
+        self._block_offsets[self._num_blocks] = self._num_transactions
+        return self._num_blocks - 1
+
+    # range of transaction offsets belonging to a block
+    def block_range(self, index: int) -> tuple:
+        return int(self._block_offsets[index]), int(self._block_offsets[index + 1])
+
+class LedgerIndex:
+    '''
+    Per-agent index over a ledger: for each agent, the offsets of the transactions it took part in, in order,
+    with the running change of its balance after each of them.
+    The index is built lazily: transactions appended to the ledger are only indexed on the next query.
+    It is kept as a few sorted runs over consecutive stretches of the ledger, like a log-structured merge tree:
+    new postings form a run of their own, and runs of similar size are merged, so every posting is merged O(log n) times.
+    '''
+
+    def __init__(self, ledger: Ledger):
+        self.ledger: Ledger = ledger
+        self._num_indexed: int = 0     # ledger transactions covered by the index
+        # runs, oldest first; each holds its postings sorted by agent, then by offset, as the arrays
+        # (agents, offsets, outgoing, running change of the agent within the run up to and including the posting)
+        self._runs: list = []
+
+    # sorted run of the postings of ledger transactions start..stop
+    def _run_of(self, start: int, stop: int) -> tuple:
+        sources, destinations = self.ledger.sources[start:stop], self.ledger.destinations[start:stop]
+        amounts = np.asarray(self.ledger.amounts[start:stop])
+        # two postings per transaction, interleaved so that the postings are in ledger order before the stable sort
+        agents = np.column_stack((sources, destinations)).ravel().astype(np.int64)
+        order = np.argsort(agents, kind='stable')
+        agents = agents[order]
+        changes = np.column_stack((-amounts, amounts)).ravel()[order]   # balance change of the posting's agent
+        # running change per agent: a cumulative sum, restarted at every agent's first posting
+        cumulative = np.cumsum(changes)
+        group_starts = np.flatnonzero(np.diff(agents, prepend=-1) != 0)
+        group_sizes = np.diff(np.append(group_starts, agents.size))
+        running = cumulative - np.repeat(cumulative[group_starts] - changes[group_starts], group_sizes)
+        return (agents,
+                np.repeat(np.arange(start, stop, dtype=np.int64), 2)[order],
+                np.tile(np.array([True, False]), stop - start)[order],
+                running)
+
+    # merge a run into the older run preceding it in the ledger, with a searchsorted insert
+    @staticmethod
+    def _merge_runs(older: tuple, newer: tuple) -> tuple:
+        old_agents, old_offsets, old_outgoing, old_running = older
+        agents, offsets, outgoing, running = newer
+        # the new postings of an agent go after its old ones, as they happened later
+        positions = np.searchsorted(old_agents, agents, 'right')
+        # and their running change continues from the agent's last old posting, if any
+        previous = positions - 1
+        clipped = np.maximum(previous, 0)
+        known = (previous >= 0) & (old_agents[clipped] == agents)
+        running = running + np.where(known, old_running[clipped], 0.0)
+        return (np.insert(old_agents, positions, agents), np.insert(old_offsets, positions, offsets),
+                np.insert(old_outgoing, positions, outgoing), np.insert(old_running, positions, running))
+
+    # index the transactions appended to the ledger since the last query
+    def _merge(self):
+        stop = self.ledger.get_num_transactions()
+        if self._num_indexed == stop:
+            return
+        self._runs.append(self._run_of(self._num_indexed, stop))
+        self._num_indexed = stop
+        # keep the run sizes decreasing geometrically
+        while len(self._runs) > 1 and self._runs[-2][0].size <= 2 * self._runs[-1][0].size:
+            newer = self._runs.pop()
+            self._runs[-1] = self._merge_runs(self._runs[-1], newer)
+
+    # per run, the run and the range of an agent's postings in it, found by binary search; oldest first
+    def _postings(self, agent: int) -> list:
+        self._merge()
+        return [(run, np.searchsorted(run[0], agent, 'left'), np.searchsorted(run[0], agent, 'right'))
+                for run in self._runs]
+
+    # offsets of the transactions an agent took part in, in the order in which they happened
+    def transactions_of(self, agent: int, outgoing: bool = None) -> np.ndarray:
+        parts = [run[1][start:stop] if outgoing is None else run[1][start:stop][run[2][start:stop] == outgoing]
+                 for run, start, stop in self._postings(agent)]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    # net change of an agent's balance over all transactions before ledger offset `offset`
+    def balance_change_before(self, agent: int, offset: int) -> float:
+        change = 0.0
+        for run, start, stop in self._postings(agent):
+            count = np.searchsorted(run[1][start:stop], offset, 'left')
+            if count > 0:
+                change += float(run[3][start + count - 1])
+        return change
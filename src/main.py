@@ -1,5 +1,3 @@
-import seaborn as sns
-
 from world import World
 
 def main():
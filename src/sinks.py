@@ -0,0 +1,108 @@
+import collections
+import json
+import os
+
+import numpy as np
+
+from block import Block
+from blockchain import Blockchain
+from ledger import Ledger
+
+class BlockSink:
+    '''
+    Receives every block of a streaming run as soon as it is sealed.
+    Subclasses decide what to keep; nothing forces the full chain to stay in memory.
+    '''
+
+    def consume(self, block: Block):
+        raise NotImplementedError
+
+    # called once the run is over
+    def close(self):
+        pass
+
+class FileSink(BlockSink):
+    '''
+    Appends every block's columns to raw binary files in directory `path`.
+    On close, the block offsets and a JSON header are written, after which FileSink.load memory-maps the ledger.
+    '''
+
+    header_file: str = 'meta.json'
+    format_name: str = 'sybil-world-stream'
+    columns: dict = {'sources': np.int64, 'destinations': np.int64, 'amounts': np.float64}
+
+    def __init__(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.files = {name: open(os.path.join(path, name + '.bin'), 'wb') for name in self.columns}
+        self.block_offsets = [0]
+
+    def consume(self, block: Block):
+        for name, dtype in self.columns.items():
+            self.files[name].write(np.ascontiguousarray(getattr(block, name), dtype=dtype).tobytes())
+        self.block_offsets.append(self.block_offsets[-1] + block.get_num_transactions())
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+        np.save(os.path.join(self.path, 'block_offsets.npy'), np.array(self.block_offsets, dtype=np.int64))
+        header = {
+            'format': self.format_name,
+            'num_blocks': len(self.block_offsets) - 1,
+            'num_transactions': self.block_offsets[-1],
+            'columns': {name: np.dtype(dtype).str for name, dtype in self.columns.items()},
+        }
+        with open(os.path.join(self.path, self.header_file), 'w') as fp:
+            json.dump(header, fp, indent=4)
+
+    # memory-map a ledger written by a FileSink
+    @classmethod
+    def load(cls, path: str) -> Blockchain:
+        with open(os.path.join(path, cls.header_file)) as fp:
+            header = json.load(fp)
+        columns = {
+            name: np.memmap(os.path.join(path, name + '.bin'), dtype=np.dtype(dtype), mode='r', shape=(header['num_transactions'],))
+            if header['num_transactions'] > 0 else np.empty(0, dtype=np.dtype(dtype))
+            for name, dtype in header['columns'].items()
+        }
+        block_offsets = np.load(os.path.join(path, 'block_offsets.npy'), mmap_mode='r')
+        return Blockchain.from_ledger(Ledger.from_columns(columns['sources'], columns['destinations'], columns['amounts'], block_offsets))
+
+class StatisticsSink(BlockSink):
+    '''Keeps running totals over the stream: block and transaction counts, volume, and mean and variance of amounts.'''
+
+    def __init__(self):
+        self.num_blocks: int = 0
+        self.num_transactions: int = 0
+        self.volume: float = 0.0
+        self.max_block_size: int = 0
+        self.mean_amount: float = 0.0
+        self._m2_amount: float = 0.0          # summed squared deviations of the amounts
+
+    def consume(self, block: Block):
+        amounts = block.amounts
+        self.num_blocks += 1
+        self.max_block_size = max(self.max_block_size, amounts.size)
+        if amounts.size == 0:
+            return
+        # merge the block's moments into the running ones (Chan et al.'s parallel algorithm)
+        num_total = self.num_transactions + amounts.size
+        block_mean = float(amounts.mean())
+        delta = block_mean - self.mean_amount
+        self.mean_amount += delta * amounts.size / num_total
+        self._m2_amount += float(((amounts - block_mean) ** 2).sum()) + delta ** 2 * self.num_transactions * amounts.size / num_total
+        self.num_transactions = num_total
+        self.volume += float(amounts.sum())
+
+    @property
+    def variance_amount(self) -> float:
+        return self._m2_amount / (self.num_transactions - 1) if self.num_transactions > 1 else float('nan')
+
+class RingBufferSink(BlockSink):
+    '''Keeps only the last k blocks.'''
+
+    def __init__(self, k: int):
+        self.blocks = collections.deque(maxlen=k)
+
+    def consume(self, block: Block):
+        self.blocks.append(block)
@@ -0,0 +1,103 @@
+import numpy as np
+
+# Stake-weighted selection of block leaders and committees on an evolving economy.
+# Agents are referred to by index; sybils are owned by adversaries, honest agents have owner -1.
+
+# assign the sybils to num_adversaries adversaries in contiguous groups of (almost) equal size
+def group_sybils(is_sybil: np.ndarray, num_adversaries: int) -> np.ndarray:
+    owners = np.full(is_sybil.size, -1, dtype=np.int64)
+    sybils = np.flatnonzero(is_sybil)
+    owners[sybils] = np.arange(sybils.size) * max(num_adversaries, 1) // max(sybils.size, 1)
+    return owners
+
+class StakeSampler:
+    '''
+    Draws agents with probability proportional to their stake.
+    The stakes are kept in a Fenwick tree, so changing a stake and drawing an agent both take O(log n).
+    '''
+
+    def __init__(self, stakes: np.ndarray, owners: np.ndarray):
+        self.stakes: np.ndarray = np.array(stakes, dtype=np.float64)   # current stake per agent
+        self.owners: np.ndarray = np.asarray(owners, dtype=np.int64)    # adversary per agent, -1 for honest agents
+        n = self.stakes.size
+        # node i (1-based) holds the sum of the stakes in (i - lowbit(i), i]
+        nodes = np.arange(1, n + 1)
+        prefix = np.concatenate(([0.0], np.cumsum(self.stakes)))
+        self._tree: np.ndarray = np.zeros(n + 1)
+        self._tree[1:] = prefix[nodes] - prefix[nodes - (nodes & -nodes)]
+        self._top: int = 1 << (n.bit_length() - 1) if n > 0 else 0   # largest power of two not above n
+
+    def get_num_agents(self): return self.stakes.size
+    def get_total_stake(self): return float(self._prefix(self.stakes.size))
+
+    # sum of the stakes of agents 0..i-1
+    def _prefix(self, i: int) -> float:
+        total = 0.0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    # add deltas[j] to the stake of agent indices[j]; repeated indices add up
+    def update(self, indices: np.ndarray, deltas: np.ndarray):
+        indices, deltas = np.asarray(indices, dtype=np.int64), np.asarray(deltas, dtype=np.float64)
+        np.add.at(self.stakes, indices, deltas)
+        nodes = indices + 1
+        while nodes.size > 0:                   # every pass moves each index one level up the tree
+            np.add.at(self._tree, nodes, deltas)
+            nodes = nodes + (nodes & -nodes)
+            keep = nodes <= self.stakes.size
+            nodes, deltas = nodes[keep], deltas[keep]
+
+    # draw agents with probability proportional to stake, with replacement; size may be a shape
+    # all draws descend the tree together, one level per pass
+    def draw(self, size, rng: np.random.Generator) -> np.ndarray:
+        targets = rng.random(size) * self.get_total_stake()
+        positions = np.zeros(np.shape(targets), dtype=np.int64)
+        step = self._top
+        while step > 0:
+            nodes = positions + step
+            valid = nodes <= self.stakes.size
+            below = self._tree[np.where(valid, nodes, 0)]
+            go = valid & (below <= targets)     # the target lies beyond this node's range
+            positions = np.where(go, nodes, positions)
+            targets = np.where(go, targets - below, targets)
+            step >>= 1
+        return np.minimum(positions, self.stakes.size - 1)   # guards against rounding at the very end
+
+    # whether each drawn leader is a sybil, i.e. an adversary wins the block under proof of stake
+    def sybil_leads(self, leaders: np.ndarray) -> np.ndarray:
+        return self.owners[leaders] >= 0
+
+    # whether each committee (one per row) consists of sybils of a single adversary only
+    def sybils_capture(self, committees: np.ndarray) -> np.ndarray:
+        owners = self.owners[committees]
+        return (owners[..., 0] >= 0) & np.all(owners == owners[..., :1], axis=-1)
+
+    # draw the leader and the committee of one block
+    # returns whether the adversaries win it under proof of stake (leader) and proof of activity (committee)
+    def elect(self, committee_size: int, rng: np.random.Generator) -> dict:
+        leader = self.draw(1, rng)
+        committee = self.draw((1, committee_size), rng)
+        return {'pos': bool(self.sybil_leads(leader)[0]), 'poa': bool(self.sybils_capture(committee)[0])}
+
+class ElectionCounter:
+    '''
+    Counts the blocks the adversaries win, per protocol, as the base of World and WorldVectorized.
+    Subclasses provide self.stake, self.rng and self.par; the counts are running, so streaming runs stay in constant memory.
+    '''
+
+    # start counting from zero
+    def init_elections(self):
+        self.sybil_wins: dict = {'pos': 0, 'poa': 0}        # number of blocks the adversaries won, per protocol
+        self.num_elections: int = 0
+
+    # elect the leader and committee of a sealed block and count whether the adversaries won it
+    def record_election(self):
+        for protocol, won in self.stake.elect(self.par.get('committee_size', 3), self.rng).items():
+            self.sybil_wins[protocol] += won
+        self.num_elections += 1
+
+    # fraction of the blocks so far that the adversaries won under `protocol`
+    def sybil_win_rate(self, protocol: str) -> float:
+        return self.sybil_wins[protocol] / self.num_elections if self.num_elections > 0 else float('nan')
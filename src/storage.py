@@ -0,0 +1,56 @@
+import json
+import os
+
+import numpy as np
+
+from blockchain import Blockchain
+from ledger import Ledger
+
+# On-disk layout of a simulation run: a directory holding one .npy file per column and a JSON metadata header.
+# The .npy files are memory-mapped on load, so a run can be analysed without reading it into memory.
+
+format_name: str = 'sybil-world-run'
+format_version: int = 1
+header_file: str = 'meta.json'
+ledger_columns: tuple = ('sources', 'destinations', 'amounts', 'block_offsets')
+agent_columns: tuple = ('balances', 'is_sybil')
+
+# write the ledger, the agents' final state and the run parameters into directory `path`
+def save_run(path: str, blockchain: Blockchain, balances: np.ndarray, is_sybil: np.ndarray, par: dict, agent_par: dict):
+    os.makedirs(path, exist_ok=True)
+    ledger = blockchain.ledger
+    columns = {
+        'sources': ledger.sources, 'destinations': ledger.destinations, 'amounts': ledger.amounts,
+        'block_offsets': ledger.block_offsets, 'balances': balances, 'is_sybil': is_sybil,
+    }
+    if blockchain.initial_balances is not None:
+        columns['initial_balances'] = blockchain.initial_balances
+    for name, column in columns.items():
+        np.save(os.path.join(path, name + '.npy'), np.ascontiguousarray(column))
+    header = {
+        'format': format_name,
+        'version': format_version,
+        'num_agents': int(balances.size),
+        'num_blocks': ledger.get_num_blocks(),
+        'num_transactions': ledger.get_num_transactions(),
+        'columns': {name: str(column.dtype) for name, column in columns.items()},
+        'par': par,
+        'agent_par': agent_par,
+    }
+    # the header is written last, so a directory with a header always holds a complete run
+    with open(os.path.join(path, header_file + '.tmp'), 'w') as fp:
+        json.dump(header, fp, indent=4)
+    os.replace(os.path.join(path, header_file + '.tmp'), os.path.join(path, header_file))
+
+# read a run written by save_run; the ledger and agent columns are memory-mapped read-only
+def load_run(path: str) -> dict:
+    with open(os.path.join(path, header_file)) as fp:
+        header = json.load(fp)
+    if header.get('format') != format_name or header.get('version') != format_version:
+        raise ValueError('%s does not hold a run in format %s version %d.' % (path, format_name, format_version))
+    columns = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in ledger_columns + agent_columns}
+    if 'initial_balances' in header['columns']:
+        columns['initial_balances'] = np.load(os.path.join(path, 'initial_balances.npy'), mmap_mode='r')
+    ledger = Ledger.from_columns(columns['sources'], columns['destinations'], columns['amounts'], columns['block_offsets'])
+    blockchain = Blockchain.from_ledger(ledger, columns.get('initial_balances'))
+    return dict(header, blockchain=blockchain, balances=columns['balances'], is_sybil=columns['is_sybil'])
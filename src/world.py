@@ -1,31 +1,57 @@
+import itertools
 import random
 
+import numpy as np
+
+from agent import Agent
 from agent_sybil import AgentSybil
 from agent_honest import AgentHonest
 from block import Block
 from blockchain import Blockchain
+from stake import ElectionCounter, StakeSampler, group_sybils
+from storage import load_run, save_run
 
-class World():
+class World(ElectionCounter):
     
     par: dict = {
         'num_epochs': 100,        # number of simulated epochs or blocks
         'num_agents': 1000,       # number of agents in simulation
         'frac_sybils': 0.1,       # fraction of agents that are Sybils
+        'num_adversaries': 1,     # number of adversaries the Sybils are divided among
+        'committee_size': 3,      # number of stakeholders drawn per block for proof of activity
     }
 
     def __init__(self):
         self.agents: list = self.init_agents()
-        self.blockchain: Blockchain = Blockchain()
+        balances = np.array([agent.balance for agent in self.agents])
+        self.blockchain: Blockchain = Blockchain(balances)
+        self.init_consensus(balances, np.array([isinstance(agent, AgentSybil) for agent in self.agents]))
 
     def init_agents(self) -> list:
         num_agents, frac_sybils = self.par['num_agents'], self.par['frac_sybils']
         agents_honest = [AgentHonest() for i in range(int(num_agents * (1-frac_sybils)))]
         agents_sybil = [AgentSybil() for i in range(int(num_agents * frac_sybils))]
-        return agents_honest + agents_sybil
+        agents = agents_honest + agents_sybil
+        for index, agent in enumerate(agents):
+            agent.index = index                 # transactions refer to agents by this index
+            agent.world = self                  # donations update the world's stakes
+        owners = group_sybils(np.array([isinstance(agent, AgentSybil) for agent in agents]), self.par['num_adversaries'])
+        for agent in agents_sybil:
+            agent.adversary = int(owners[agent.index])
+        return agents
 
-    # generate transaction history for a set number of epochs
-    def run(self):
-        for i in range(self.par['num_epochs']):
+    # stake-weighted leader and committee selection over the agents' balances, indexed by agent
+    # the numpy generator is seeded from random, so random.seed fixes the elections too
+    def init_consensus(self, balances: np.ndarray, is_sybil: np.ndarray):
+        self.rng: np.random.Generator = np.random.default_rng(random.getrandbits(64))
+        self.stake: StakeSampler = StakeSampler(balances, group_sybils(is_sybil, self.par.get('num_adversaries', 1)))
+        self.init_elections()
+
+    # generate transaction history for a set number of epochs, yielding each block as soon as it is sealed
+    # the blocks are not added to self.blockchain, so the caller decides what to keep
+    def stream(self, num_epochs: float = None):
+        num_epochs = num_epochs if num_epochs is not None else self.par['num_epochs']     # may be math.inf
+        for i in itertools.takewhile(lambda epoch: epoch < num_epochs, itertools.count()):
 
             block: Block = Block()              # each epoch creates a new block
             random.shuffle(self.agents)         # shuffle the agent list
@@ -40,10 +66,42 @@ class World():
                 transaction: Transaction = (agent, partner, amount) # bundle transaction
                 block.add_transaction(transaction)                  # add transaction to block
 
-            self.blockchain.add_block(block)                        # append block to blockchain
+            self.record_election()              # the block's leader and committee are drawn from the stakes at its end
+            yield block
+
+    # generate transaction history for a set number of epochs
+    # every block is passed to the sinks; with keep_chain=False the chain is not kept in memory
+    def run(self, sinks: list = (), keep_chain: bool = True):
+        for block in self.stream():
+            if keep_chain:
+                self.blockchain.add_block(block)                    # append block to blockchain
+            for sink in sinks:
+                sink.consume(block)
+        for sink in sinks:
+            sink.close()
+
+    # write the ledger, final balances and parameters to directory `path`, see storage.py for the format
+    def save(self, path: str = 'world_run'):
+        agents = sorted(self.agents, key=lambda agent: agent.index)
+        balances = np.array([agent.balance for agent in agents], dtype=np.float64)
+        is_sybil = np.array([isinstance(agent, AgentSybil) for agent in agents], dtype=bool)
+        save_run(path, self.blockchain, balances, is_sybil, self.par, Agent.par)
 
-    def save(self):
-        NotImplemented
+    # read a run written by save; the ledger stays memory-mapped on disk
+    @classmethod
+    def load(cls, path: str) -> 'World':
+        run = load_run(path)
+        world = cls.__new__(cls)
+        world.par = run['par']
+        world.blockchain = run['blockchain']
+        world.agents = [AgentSybil() if sybil else AgentHonest() for sybil in run['is_sybil']]
+        for index, (agent, balance) in enumerate(zip(world.agents, run['balances'])):
+            agent.index, agent.balance, agent.world = index, float(balance), world
+        world.init_consensus(np.array(run['balances']), np.array(run['is_sybil']))
+        for agent in world.agents:
+            if isinstance(agent, AgentSybil):
+                agent.adversary = int(world.stake.owners[agent.index])
+        return world
 
     def plot(self):
         NotImplemented
\ No newline at end of file
@@ -0,0 +1,119 @@
+import itertools
+
+import numpy as np
+
+from agent import Agent
+from block import Block
+from blockchain import Blockchain
+from stake import ElectionCounter, StakeSampler, group_sybils
+from storage import load_run, save_run
+from world import World
+
+class WorldVectorized(ElectionCounter):
+    '''
+    Array-backed alternative to World.
+    Agent state lives in NumPy arrays and each epoch's donations are decided in a few vectorized steps.
+    '''
+
+    par: dict = World.par                   # same simulation parameters as World
+    agent_par: dict = Agent.par             # same agent behaviour as Agent
+
+    def __init__(self, rng: np.random.Generator = None):
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng()
+        self.balances, self.is_sybil = self.init_agents()
+        self.blockchain: Blockchain = Blockchain(self.balances.copy())
+        self.init_consensus()
+
+    # honest agents first, then sybils, like World.init_agents
+    def init_agents(self) -> tuple:
+        num_agents, frac_sybils = self.par['num_agents'], self.par['frac_sybils']
+        num_honest, num_sybil = int(num_agents * (1-frac_sybils)), int(num_agents * frac_sybils)
+        rnd_dev = self.agent_par['init_balance_deviation']
+        balances = self.agent_par['init_balance'] + self.rng.uniform(-rnd_dev, rnd_dev, size=num_honest + num_sybil)
+        is_sybil = np.concatenate((np.zeros(num_honest, dtype=bool), np.ones(num_sybil, dtype=bool)))
+        return balances, is_sybil
+
+    # stake-weighted leader and committee selection over the balances, like World.init_consensus
+    def init_consensus(self):
+        self.stake: StakeSampler = StakeSampler(self.balances, group_sybils(self.is_sybil, self.par.get('num_adversaries', 1)))
+        self.init_elections()
+
+    # decide the donations of one epoch
+    # returns donors, recipients and amounts in the order in which the donations take place
+    # all work is proportional to the number of donors, not to the number of agents
+    def epoch_donations(self) -> tuple:
+        n = self.balances.size
+        min_don, max_frac = self.agent_par['min_don_amount'], self.agent_par['max_frac_donated']
+
+        # every agent wants to donate with probability donate_prob; the order among them is random, as in World.run
+        num_candidates = self.rng.binomial(n, self.agent_par['donate_prob'])
+        donors = self.rng.choice(n, size=num_candidates, replace=False, shuffle=True)
+        partners = self.rng.integers(0, n - 1, size=num_candidates)
+        partners += partners >= donors                          # skip the donor itself
+        fractions = self.rng.random(num_candidates)            # where in [min_don, max_don] the amount lies
+
+        # An agent's balance only changes before its turn by donations it receives earlier in the epoch.
+        # Those depend on the earlier donors' balances in turn, so iterate until the earlier-received amounts settle;
+        # this takes as many passes as the longest chain of donations within the epoch, normally two or three.
+        # look the partners up among the donors sorted by index, so that no array over all agents is needed
+        by_agent = np.argsort(donors)
+        position = np.searchsorted(donors[by_agent], partners)
+        donating = position < num_candidates
+        donating[donating] = donors[by_agent[position[donating]]] == partners[donating]
+        partner_turn = np.full(num_candidates, -1)
+        partner_turn[donating] = by_agent[position[donating]]
+        received_before = np.zeros(num_candidates)
+        while True:
+            balance_at_turn = self.balances[donors] + received_before
+            eligible = balance_at_turn >= min_don
+            max_don = np.minimum(balance_at_turn, balance_at_turn * max_frac)
+            amounts = np.where(eligible, min_don + fractions * (max_don - min_don), 0.0)
+            later = partner_turn > np.arange(num_candidates)  # the partner's own turn is still to come
+            updated = np.bincount(partner_turn[later], weights=amounts[later], minlength=num_candidates)
+            if np.array_equal(updated, received_before):
+                break
+            received_before = updated
+
+        return donors[eligible], partners[eligible], amounts[eligible]
+
+    # generate transaction history for a set number of epochs, yielding each block as soon as it is sealed
+    # the blocks are not added to self.blockchain, so the caller decides what to keep
+    def stream(self, num_epochs: float = None):
+        num_epochs = num_epochs if num_epochs is not None else self.par['num_epochs']     # may be math.inf
+        for i in itertools.takewhile(lambda epoch: epoch < num_epochs, itertools.count()):
+            donors, partners, amounts = self.epoch_donations()
+            np.subtract.at(self.balances, donors, amounts)
+            np.add.at(self.balances, partners, amounts)
+            self.stake.update(np.concatenate((donors, partners)), np.concatenate((-amounts, amounts)))   # once per epoch
+            self.record_election()
+
+            block: Block = Block()                                  # each epoch creates a new block
+            block.add_transactions(donors, partners, amounts)      # transactions refer to agents by index
+            yield block
+
+    # generate transaction history for a set number of epochs
+    # every block is passed to the sinks; with keep_chain=False the chain is not kept in memory
+    def run(self, sinks: list = (), keep_chain: bool = True):
+        for block in self.stream():
+            if keep_chain:
+                self.blockchain.add_block(block)                    # append block to blockchain
+            for sink in sinks:
+                sink.consume(block)
+        for sink in sinks:
+            sink.close()
+
+    # write the ledger, final balances and parameters to directory `path`, see storage.py for the format
+    def save(self, path: str = 'world_run'):
+        save_run(path, self.blockchain, self.balances, self.is_sybil, self.par, self.agent_par)
+
+    # read a run written by save (by either World or WorldVectorized); the ledger stays memory-mapped on disk
+    @classmethod
+    def load(cls, path: str, rng: np.random.Generator = None) -> 'WorldVectorized':
+        run = load_run(path)
+        world = cls.__new__(cls)
+        world.par, world.agent_par = run['par'], run['agent_par']
+        world.rng = rng if rng is not None else np.random.default_rng()
+        world.balances, world.is_sybil = np.array(run['balances']), run['is_sybil']
+        world.blockchain = run['blockchain']
+        world.init_consensus()
+        return world
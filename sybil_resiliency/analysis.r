@@ -96,7 +96,8 @@ visualised_results <- function(file, title) {
 main <- function() {
 	load_libraries()
 	results_dir <- paste0(getwd(), '/results')
-	csvs <- list.files(results_dir, pattern='(\\.)(csv)')
+	# only the per-episode results; the subdirectories ('ci', 'paired' and 'moments') and temporary '.csv.tmp' files are skipped
+	csvs <- list.files(results_dir, pattern='\\.csv$', recursive=FALSE)
 	if (!dir.exists(paste0(getwd(), '/plots'))) {
 		dir.create(paste0(getwd(), '/plots'))
 	}
@@ -0,0 +1,137 @@
+import hashlib
+import io
+import json
+import numpy as np
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ResultCache:
+	"""
+	A content-addressed, size-bounded on-disk cache of the per-episode results of sybil resiliency experiments.
+
+	An entry is keyed by a hash of the experiment's configuration together with the version of the simulation code,
+	but not by its number of episodes. Episode ``i`` of a seeded experiment always draws from the same random stream,
+	so an entry holding fewer episodes than asked for is extended with the missing ones instead of being recomputed.
+
+	Entries are compressed NumPy archives. Once the cache grows beyond ``max_bytes``, the least recently used entries
+	are evicted.
+	"""
+
+	DEFAULT_DIR_NAME: str = '.cache'
+	DEFAULT_MAX_BYTES: int = 256 * 2 ** 20
+	ENTRY_SUFFIX: str = '.npz'
+	# the modules whose code determines the results, besides those of the protocol registry
+	SOURCE_FILES: Tuple[str, ...] = ('resiliencies.py', 'network.py', 'snowball.py', 'ouroboros.py')
+	PROTOCOLS_DIR_NAME: str = 'protocols'
+
+	_code_version: Optional[str] = None
+
+	def __init__(self, dir_name: str = DEFAULT_DIR_NAME, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+		"""
+		Constructs a cache, creating its directory if needed.
+
+		:param dir_name: Optional. The directory holding the entries.
+		:param max_bytes: Optional. The total size of the entries beyond which the least recently used are evicted.
+		"""
+		self._dir_name = dir_name
+		self._max_bytes = max_bytes
+		os.makedirs(dir_name, exist_ok=True)
+
+	@staticmethod
+	def code_version() -> str:
+		"""
+		Gives a hash of the simulation code, so that changing the code invalidates all entries.
+
+		:return: The hash, as a hexadecimal string.
+		"""
+		if ResultCache._code_version is None:
+			source_dir: str = os.path.dirname(os.path.abspath(__file__))
+			protocol_files: List[str] = sorted(
+				os.path.join(ResultCache.PROTOCOLS_DIR_NAME, file_name)
+				for file_name in os.listdir(os.path.join(source_dir, ResultCache.PROTOCOLS_DIR_NAME))
+				if file_name.endswith('.py'))
+			digest = hashlib.sha256()
+			for file_name in ResultCache.SOURCE_FILES + tuple(protocol_files):
+				with open(os.path.join(source_dir, file_name), 'rb') as fp:
+					digest.update(fp.read())
+			ResultCache._code_version = digest.hexdigest()
+		return ResultCache._code_version
+
+	@staticmethod
+	def key(config: Dict[str, Any]) -> str:
+		"""
+		Gives the key of an experiment configuration.
+
+		:param config: The configuration. Must be JSON-serialisable, and must not contain the number of episodes.
+		:return: The key, as a hexadecimal string.
+		"""
+		payload: str = json.dumps(dict(config, code_version=ResultCache.code_version()), sort_keys=True)
+		return hashlib.sha256(payload.encode()).hexdigest()
+
+	def _entry_path(self, key: str) -> str:
+		"""
+		Gives the path of the entry of a key.
+
+		:param key: The key.
+		:return: The path.
+		"""
+		return os.path.join(self._dir_name, key + ResultCache.ENTRY_SUFFIX)
+
+	def lookup(self, config: Dict[str, Any]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+		"""
+		Looks up the results of a configuration, and marks the entry as recently used.
+
+		:param config: The configuration.
+		:return: The win counts, of shape ``(num_protocols, num_cached_episodes)``, and the chain quality per episode;
+			or ``None`` if nothing is cached.
+		"""
+		path: str = self._entry_path(ResultCache.key(config))
+		try:
+			with np.load(path) as entry:
+				counts, chain_quality = entry['counts'], entry['chain_quality']
+		except (FileNotFoundError, ValueError, KeyError, OSError):
+			return None  # absent, or unreadable and about to be overwritten
+		os.utime(path)
+		return counts, chain_quality
+
+	def store(self, config: Dict[str, Any], counts: np.ndarray, chain_quality: np.ndarray) -> None:
+		"""
+		Stores the results of a configuration, replacing any entry holding fewer episodes, and evicts the least
+		recently used entries if the cache grew too large.
+
+		:param config: The configuration.
+		:param counts: The win counts, of shape ``(num_protocols, num_episodes)``.
+		:param chain_quality: The chain quality per episode.
+		"""
+		cached: Optional[Tuple[np.ndarray, np.ndarray]] = self.lookup(config)
+		if cached is not None and cached[0].shape[1] >= counts.shape[1]:
+			return
+		buffer = io.BytesIO()
+		np.savez_compressed(
+			buffer, counts=counts, chain_quality=chain_quality, config=np.array(json.dumps(config, sort_keys=True)))
+		fd, tmp_path = tempfile.mkstemp(dir=self._dir_name, suffix='.tmp')
+		with os.fdopen(fd, 'wb') as fp:
+			fp.write(buffer.getvalue())
+		os.replace(tmp_path, self._entry_path(ResultCache.key(config)))
+		self._evict()
+
+	def _evict(self) -> None:
+		"""
+		Removes the least recently used entries until the cache fits within its size bound.
+		"""
+		entries: List[Tuple[float, int, str]] = []
+		for file_name in os.listdir(self._dir_name):
+			if file_name.endswith(ResultCache.ENTRY_SUFFIX):
+				stat = os.stat(os.path.join(self._dir_name, file_name))
+				entries.append((stat.st_mtime, stat.st_size, file_name))
+		total: int = sum(size for _, size, _ in entries)
+		for _, size, file_name in sorted(entries):
+			if total <= self._max_bytes:
+				break
+			try:
+				os.remove(os.path.join(self._dir_name, file_name))
+			except FileNotFoundError:
+				pass  # evicted concurrently
+			total -= size
@@ -0,0 +1,495 @@
+import numpy as np
+from enum import Enum
+from typing import Dict, List, Optional, Tuple, Union
+
+
+class ConsensusProtocol(Enum):
+	"""
+	Stores symbols for referring to consensus protocols in cryptocurrencies and beyond.
+	"""
+	PROOF_OF_WORK = 'pow'
+	PROOF_OF_STAKE = 'pos'
+	PROOF_OF_ACTIVITY = 'poa'
+	ALGORAND_PROOF = 'algorand'
+	OUROBOROS = 'ouroboros'
+	AVALANCHE = 'avalanche'
+	FNP2 = 'fnp2'
+	CONITZER_TWO_ALT = 'con_two'
+	CONITZER_MANY_ALT = 'con_many'
+	MAJORITY = 'majority'
+
+
+class Network:
+	"""
+	An abstract model of a peer-to-peer cryptocurrency network containing honest users as well as sybils.
+	"""
+
+	SYBILS_PER_ADVERSARY_MIN_MAX: Tuple[int, int] = (10, 20)  # both ends inclusive
+	COMPUTING_POWER_ALPHA: float = float(np.log(5) / np.log(4))  # to get close to the 80-20 rule
+	ASSET_SIZE_ALPHA: float = float(np.log(5) / np.log(4))
+	COST: float = float(0.15)  # Conitzer 0.15 cost
+
+	class TwoAlternativeElections:
+		"""
+		A batch of independent two-alternative elections, in which the honest users vote uniformly at random and all
+		sybils vote for the alternative their (single) adversary prefers.
+
+		Alternatives are coded by their index into ``Network.TwoAlternativeElection.ALTERNATIVES``.
+		"""
+
+		def __init__(
+				self,
+				num_honest: int,
+				num_adversary: int,
+				n: int,
+				num_elections: int,
+				rng: np.random.Generator) -> None:
+			"""
+			Holds a batch of elections.
+
+			:param num_honest: The number of honest users.
+			:param num_adversary: The number of adversaries. At most one is allowed.
+			:param n: The number of identities.
+			:param num_elections: The number of elections to hold.
+			:param rng: A random number generator to draw randomness from.
+			"""
+			if num_adversary > 1:
+				raise ValueError(
+					'A two-alternative election requires at most one adversary (got %d).' %
+					(num_adversary,))
+			honest_votes_a: np.ndarray = rng.binomial(n=num_honest, p=0.5, size=num_elections)
+			honest_votes_b: np.ndarray = num_honest - honest_votes_a
+			# mirrors ``max(Counter(choices))``: the last alternative (in order) that got any honest vote
+			self.honest_majority_choice: np.ndarray = (honest_votes_b > 0).astype(np.int64)
+			self.sybil_choice: np.ndarray = rng.integers(low=0, high=2, size=num_elections)
+			num_sybils: int = n - num_honest
+			self.number_votes_a: np.ndarray = honest_votes_a + num_sybils * (self.sybil_choice == 0)
+			self.number_votes_b: np.ndarray = honest_votes_b + num_sybils * (self.sybil_choice == 1)
+
+		@staticmethod
+		def fnp2_probability_picking_a(votes_a: np.ndarray, votes_b: np.ndarray, cost: float) -> np.ndarray:
+			"""
+			Gives the probability with which FNP-2 picks alternative 'a', given the number of votes for either one.
+
+			:param votes_a: The number of votes for alternative 'a'.
+			:param votes_b: The number of votes for alternative 'b'.
+			:param cost: The per-vote cost.
+			:return: The probabilities.
+			"""
+			leading: np.ndarray = np.where(votes_a >= votes_b, votes_a, votes_b)
+			trailing: np.ndarray = np.where(votes_a >= votes_b, votes_b, votes_a)
+			probability_picking_leading: np.ndarray = np.where(
+				(leading > trailing) & (trailing == 0),
+				1.0,
+				np.minimum(1.0, (1.0 / 2.0) + cost * (leading - trailing)))
+			return np.where(votes_a >= votes_b, probability_picking_leading, 1 - probability_picking_leading)
+
+		def fnp2_picks(self, cost: float, rng: np.random.Generator) -> np.ndarray:
+			"""
+			Gives the alternative FNP-2 picks in each election.
+
+			:param cost: The per-vote cost.
+			:param rng: A random number generator to draw randomness from.
+			:return: The picked alternatives.
+			"""
+			probability_picking_a: np.ndarray = Network.TwoAlternativeElections.fnp2_probability_picking_a(
+				self.number_votes_a, self.number_votes_b, cost)
+			return (rng.random(size=probability_picking_a.shape) >= probability_picking_a).astype(np.int64)
+
+		def majority_picks(self) -> np.ndarray:
+			"""
+			Gives the alternative the majority rule picks in each election. Ties go to alternative 'b'.
+
+			:return: The picked alternatives.
+			"""
+			return (self.number_votes_a <= self.number_votes_b).astype(np.int64)
+
+		def sybils_win(self, picks: np.ndarray) -> np.ndarray:
+			"""
+			Determines, per election, whether the sybils got their way against the will of the honest majority.
+
+			:param picks: The alternative picked in each election.
+			:return: The answers.
+			"""
+			return (picks == self.sybil_choice) & (picks != self.honest_majority_choice)
+
+	class TwoAlternativeElection:
+		"""
+		A single two-alternative election. A thin wrapper around a batch of one of ``TwoAlternativeElections``.
+		"""
+
+		ALTERNATIVES: Tuple[str, str] = ('a', 'b')
+
+		def __init__(self, num_honest: int, num_adversary: int, n: int, rng: np.random.Generator) -> None:
+			elc = Network.TwoAlternativeElections(num_honest, num_adversary, n, 1, rng)
+			self.number_votes_a: int = int(elc.number_votes_a[0])
+			self.number_votes_b: int = int(elc.number_votes_b[0])
+			self.honest_majority_choice: str = \
+				Network.TwoAlternativeElection.ALTERNATIVES[elc.honest_majority_choice[0]]
+			self.sybil_choice: str = Network.TwoAlternativeElection.ALTERNATIVES[elc.sybil_choice[0]]
+
+	def __init__(
+			self,
+			num_honest: int,
+			num_adversary: int,
+			sybils_per_adversary: Optional[Tuple[int, ...]] = None,
+			rng: Optional[np.random.Generator] = None,
+			cost: float = COST) -> None:
+		"""
+		Constructs a network.
+
+		:param num_honest: The number of honest users.
+		:param num_adversary: The number of adversaries. These are single users that possess one or more sybils.
+		:param sybils_per_adversary: Optional. A listing of the number of sybils each adversary possesses.
+		:param rng: Optional. A random number generator to generate the network with.
+		:param cost: Optional. The per-vote cost used by FNP-2.
+		"""
+		self._num_honest = num_honest
+		self._num_adversaries = num_adversary
+		self.cost = cost
+		self._rng = rng if rng is not None else np.random.default_rng()
+		if sybils_per_adversary is None:
+			self._sybils_per_adversary: np.ndarray = self._rng.integers(
+				low=Network.SYBILS_PER_ADVERSARY_MIN_MAX[0],
+				high=Network.SYBILS_PER_ADVERSARY_MIN_MAX[1] + 1,
+				size=self._num_adversaries)
+		else:
+			self._sybils_per_adversary = np.asarray(sybils_per_adversary, dtype=np.int64)
+		self.n: int = self._num_honest + int(np.sum(self._sybils_per_adversary))
+		# identities of adversary ``a`` occupy ``[self._sybil_offsets[a], self._sybil_offsets[a + 1])``
+		self._sybil_offsets: np.ndarray = \
+			self._num_honest + np.concatenate(([0], np.cumsum(self._sybils_per_adversary, dtype=np.int64)))
+		self._owners: np.ndarray = self._identity_owners()
+		self._alias_tables: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # built lazily, see ``_alias_table``
+		self._cumulative_distributions: Dict[str, np.ndarray] = {}  # built lazily, see ``_cumulative_distribution``
+		# both are read-only, as the cached alias tables and cumulative distributions are derived from them
+		self.computing_powers: np.ndarray = self._user_computing_powers()
+		self.asset_sizes: np.ndarray = self._user_asset_sizes()
+
+	def _distributed_across_sybils(self, totals: np.ndarray) -> np.ndarray:
+		"""
+		Yields some asset of every adversary, spread out uniformly over their sybils.
+
+		:param totals: Per adversary, the total amount of the asset.
+		:return: An array containing, per sybil, their respective share of the asset.
+		"""
+		return np.repeat(totals / self._sybils_per_adversary, self._sybils_per_adversary)
+
+	def _user_attribute(self, alpha: float) -> np.ndarray:
+		"""
+		Gives a read-only array holding a Pareto-distributed attribute for each identity.
+
+		Each honest user draws the attribute once. Each adversary draws it once too, and spreads it out over their
+		sybils.
+
+		:param alpha: The shape of the Pareto distribution.
+		:return: The array.
+		"""
+		out: np.ndarray = np.empty(shape=self.n, dtype=np.float64)
+		out[:self._num_honest] = self._rng.pareto(a=alpha, size=self._num_honest)
+		out[self._num_honest:] = self._distributed_across_sybils(self._rng.pareto(a=alpha, size=self._num_adversaries))
+		out.flags.writeable = False
+		return out
+
+	def _user_computing_powers(self) -> np.ndarray:
+		"""
+		Gives an array of the computing power each identity has.
+
+		:return: The array.
+		"""
+		return self._user_attribute(Network.COMPUTING_POWER_ALPHA)
+
+	def _user_asset_sizes(self) -> np.ndarray:
+		"""
+		Gives an array which, for each identity, states the size of their cryptocurrency wallet.
+
+		:return: The array.
+		"""
+		return self._user_attribute(Network.ASSET_SIZE_ALPHA)
+
+	@staticmethod
+	def _build_alias_table(weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Builds a Walker alias table for a discrete distribution, with vectorized passes instead of Vose's loop.
+
+		Every outcome starts with a column of its own. Columns holding less than one unit (small) are topped up by
+		columns holding more (large). In each pass, the deficits of all small columns and the excesses of all large
+		columns are laid out on two cumulative scales, and every small column takes its deficit from the large column
+		whose excess covers the start of that deficit. A large column that drops below one unit becomes small in the
+		next pass. Every pass settles at least one large column, and in practice a handful of passes suffice.
+
+		:param weights: The (unnormalised) weight of each outcome.
+		:return: The acceptance probability and the alias of each outcome.
+		"""
+		n: int = weights.size
+		remaining: np.ndarray = weights * (n / weights.sum())
+		acceptance: np.ndarray = np.ones(shape=n, dtype=float)
+		alias: np.ndarray = np.arange(n, dtype=np.int64)
+		small: np.ndarray = np.flatnonzero(remaining < 1.0)
+		large: np.ndarray = np.flatnonzero(remaining >= 1.0)
+		while small.size > 0 and large.size > 0:
+			deficits: np.ndarray = 1.0 - remaining[small]
+			deficit_starts: np.ndarray = np.cumsum(deficits) - deficits
+			donors: np.ndarray = np.searchsorted(np.cumsum(remaining[large] - 1.0), deficit_starts, side='right')
+			served: np.ndarray = donors < large.size  # the others only lack a donor through rounding errors
+			if not served.any():
+				break
+			acceptance[small[served]] = remaining[small[served]]
+			alias[small[served]] = large[donors[served]]
+			remaining[large] -= np.bincount(donors[served], weights=deficits[served], minlength=large.size)
+			depleted: np.ndarray = remaining[large] < 1.0
+			small = np.concatenate((small[~served], large[depleted]))
+			large = large[~depleted]
+		# whatever is left over has (up to rounding errors) a scaled weight of exactly one
+		return acceptance, alias
+
+	def _alias_table(self, attribute: str) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Gives the alias table of the distribution described by one of the network's per-identity attributes.
+
+		The table is built on first use and cached afterwards.
+
+		:param attribute: The name of the attribute, either ``'computing_powers'`` or ``'asset_sizes'``.
+		:return: The acceptance probability and the alias of each identity.
+		"""
+		if attribute not in self._alias_tables:
+			self._alias_tables[attribute] = Network._build_alias_table(getattr(self, attribute))
+		return self._alias_tables[attribute]
+
+	def _draw_weighted(
+			self,
+			attribute: str,
+			size: Union[int, Tuple[int, ...]],
+			rng: np.random.Generator) -> np.ndarray:
+		"""
+		Draws identities with replacement, proportionally to one of the network's per-identity attributes.
+
+		Each draw costs constant time: one uniform variate picks a column of the attribute's alias table by its
+		integer part, and decides between the column's identity and its alias by its fractional part.
+
+		:param attribute: The name of the attribute, either ``'computing_powers'`` or ``'asset_sizes'``.
+		:param size: The number of draws, or the shape of the array of draws.
+		:param rng: A random number generator to draw randomness from.
+		:return: The indices of the drawn identities.
+		"""
+		acceptance, alias = self._alias_table(attribute)
+		scaled: np.ndarray = rng.random(size=size) * self.n
+		candidates: np.ndarray = np.minimum(scaled.astype(np.int64), self.n - 1)
+		return np.where(scaled - candidates < acceptance[candidates], candidates, alias[candidates])
+
+	def draw_by_computing_power(self, size: Union[int, Tuple[int, ...]], rng: np.random.Generator) -> np.ndarray:
+		"""
+		Draws identities with replacement, each with a probability proportional to its computing power.
+
+		:param size: The number of draws, or the shape of the array of draws.
+		:param rng: A random number generator to draw randomness from.
+		:return: The indices of the drawn identities.
+		"""
+		return self._draw_weighted('computing_powers', size, rng)
+
+	def draw_by_asset_size(self, size: Union[int, Tuple[int, ...]], rng: np.random.Generator) -> np.ndarray:
+		"""
+		Draws identities with replacement, each with a probability proportional to the size of its wallet.
+
+		:param size: The number of draws, or the shape of the array of draws.
+		:param rng: A random number generator to draw randomness from.
+		:return: The indices of the drawn identities.
+		"""
+		return self._draw_weighted('asset_sizes', size, rng)
+
+	def _cumulative_distribution(self, attribute: str) -> np.ndarray:
+		"""
+		Gives the cumulative distribution function over the identities described by one of the network's attributes.
+
+		The distribution is built on first use and cached afterwards.
+
+		:param attribute: The name of the attribute, either ``'computing_powers'`` or ``'asset_sizes'``.
+		:return: Per identity, the probability of drawing it or any identity before it.
+		"""
+		if attribute not in self._cumulative_distributions:
+			cumulative: np.ndarray = np.cumsum(getattr(self, attribute))
+			self._cumulative_distributions[attribute] = cumulative / cumulative[-1]
+		return self._cumulative_distributions[attribute]
+
+	def _invert_weighted(self, attribute: str, uniforms: np.ndarray) -> np.ndarray:
+		"""
+		Maps uniform variates to identities by inverse-CDF sampling, proportionally to one of the network's
+		per-identity attributes.
+
+		Unlike alias sampling, the mapping is monotone, so equal variates give equal identities across attributes and
+		protocols. This is what makes common random numbers effective; other draws use ``_draw_weighted``. Each draw
+		costs a binary search.
+
+		:param attribute: The name of the attribute, either ``'computing_powers'`` or ``'asset_sizes'``.
+		:param uniforms: Variates in ``[0, 1)``, of any shape.
+		:return: The indices of the drawn identities, of the same shape.
+		"""
+		cumulative: np.ndarray = self._cumulative_distribution(attribute)
+		return np.minimum(np.searchsorted(cumulative, uniforms, side='right'), self.n - 1)
+
+	def identities_by_computing_power(self, uniforms: np.ndarray) -> np.ndarray:
+		"""
+		Maps uniform variates to identities, each with a probability proportional to its computing power.
+
+		:param uniforms: Variates in ``[0, 1)``, of any shape.
+		:return: The indices of the drawn identities.
+		"""
+		return self._invert_weighted('computing_powers', uniforms)
+
+	def identities_by_asset_size(self, uniforms: np.ndarray) -> np.ndarray:
+		"""
+		Maps uniform variates to identities, each with a probability proportional to the size of its wallet.
+
+		:param uniforms: Variates in ``[0, 1)``, of any shape.
+		:return: The indices of the drawn identities.
+		"""
+		return self._invert_weighted('asset_sizes', uniforms)
+
+	def _identity_owners(self) -> np.ndarray:
+		"""
+		Gives an array which, for each identity, states the index of the adversary owning it.
+
+		:return: The array. Honest users are marked with ``-1``.
+		"""
+		dtype = np.int8 if self._num_adversaries < np.iinfo(np.int8).max else np.int32
+		return np.repeat(
+			np.arange(-1, self._num_adversaries, dtype=dtype),
+			np.concatenate(([self._num_honest], self._sybils_per_adversary)).astype(np.int64))
+
+	@property
+	def num_honest(self) -> int:
+		"""
+		Gives the number of honest users. Their identities precede those of the sybils.
+
+		:return: The number of honest users.
+		"""
+		return self._num_honest
+
+	@property
+	def num_adversaries(self) -> int:
+		"""
+		Gives the number of adversaries.
+
+		:return: The number of adversaries.
+		"""
+		return self._num_adversaries
+
+	@property
+	def sybils_per_adversary(self) -> np.ndarray:
+		"""
+		Gives the number of sybils each adversary possesses.
+
+		:return: The numbers of sybils, one per adversary.
+		"""
+		return self._sybils_per_adversary
+
+	@property
+	def sybil_offsets(self) -> np.ndarray:
+		"""
+		Gives the prefix offsets of the adversaries' identities: those of adversary ``a`` are the identities from
+		``sybil_offsets[a]`` up to (excluding) ``sybil_offsets[a + 1]``.
+
+		:return: The offsets, one more than there are adversaries.
+		"""
+		return self._sybil_offsets
+
+	def adversary_shares(self, weights: np.ndarray) -> np.ndarray:
+		"""
+		Gives, per adversary, the share of some weight held by their sybils together.
+
+		:param weights: The weight of each identity, such as its computing power or asset size.
+		:return: The shares, one per adversary.
+		"""
+		cumulative: np.ndarray = np.concatenate(([0.0], np.cumsum(weights, dtype=np.float64)))
+		return np.diff(cumulative[self._sybil_offsets]) / cumulative[-1]
+
+	def is_sybil(self, identity_index: Union[int, np.ndarray]) -> Union[bool, np.ndarray]:
+		"""
+		Determines whether the identity associated with the supplied index is a sybil.
+
+		:param identity_index: The index associated with the identity. May also be an array of indices.
+		:return: The question's answer. An array of answers if an array of indices is supplied.
+		"""
+		return identity_index >= self._num_honest
+
+	def owner_of(self, identity_indices: Union[int, np.ndarray]) -> Union[int, np.ndarray]:
+		"""
+		Gives the index of the adversary owning each of the supplied identities.
+
+		:param identity_indices: The index associated with an identity, or an array of such indices.
+		:return: The adversary index (or indices). Honest users are marked with ``-1``.
+		"""
+		return self._owners[identity_indices]
+
+	def sybils_belong_to_same_user(self, identity_indices: Union[List[int], np.ndarray]) -> Union[bool, np.ndarray]:
+		"""
+		Determines whether the identities associated with the supplied indices are sybils from one single adversary.
+
+		This method also checks whether any of the supplied indices is not a sybil in the first place. If such a
+		situation occurs, this method automatically returns with ``False``.
+
+		A 2-D array may be supplied to answer the question for a batch of coalitions at once, one per row.
+
+		:param identity_indices: The indices for the identities.
+		:return: The question's answer. For a 2-D input, a boolean array with one answer per row.
+		"""
+		owners: np.ndarray = self._owners[np.asarray(identity_indices, dtype=np.int64)]
+		if owners.ndim == 1:
+			if owners.size == 0:
+				return self._num_adversaries > 0
+			return bool(owners[0] >= 0 and np.all(owners == owners[0]))
+		if owners.shape[1] == 0:
+			return np.full(shape=owners.shape[0], fill_value=self._num_adversaries > 0)
+		return (owners[:, 0] >= 0) & np.all(owners == owners[:, :1], axis=1)
+
+	def network_reached_unanimous_two_alternative_decision(self) -> bool:
+		"""
+		Determines whether the network voted unanimously for one alternative among two.
+
+		Note that if a unanimous decision is reached, the sybils did not succeed in overthrowing the 'sybil-free'
+		social choice, as this is what the honest users wanted as well.
+
+		:return: The question's answer.
+		"""
+		choices: np.ndarray = self._rng.choice(a=[0, 1], size=self.n, replace=True)
+		return choices.sum() in (0, self.n)  # everyone voted either False or True
+
+	def sybils_win_fnp2(self) -> bool:
+		"""
+		Determines whether in FNP-2 the sybils won the consensus round.
+
+		:return: The question's answer.
+		"""
+		return bool(self.sybils_win_fnp2_rounds(1)[0])
+
+	def sybils_win_fnp2_rounds(self, num_rounds: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+		"""
+		Determines, for a number of independent FNP-2 rounds, whether the sybils won each round.
+
+		:param num_rounds: The number of rounds.
+		:param rng: Optional. A random number generator to draw randomness from. Defaults to the network's own.
+		:return: The answers, one per round.
+		"""
+		rng = rng if rng is not None else self._rng
+		elc = Network.TwoAlternativeElections(self._num_honest, self._num_adversaries, self.n, num_rounds, rng)
+		return elc.sybils_win(elc.fnp2_picks(self.cost, rng))
+
+	def sybils_win_majority(self) -> bool:
+		"""
+		Determines whether in the majority consensus rule, the sybils won the round.
+
+		:return: The question's answer.
+		"""
+		return bool(self.sybils_win_majority_rounds(1)[0])
+
+	def sybils_win_majority_rounds(self, num_rounds: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+		"""
+		Determines, for a number of independent rounds of the majority consensus rule, whether the sybils won each.
+
+		:param num_rounds: The number of rounds.
+		:param rng: Optional. A random number generator to draw randomness from. Defaults to the network's own.
+		:return: The answers, one per round.
+		"""
+		rng = rng if rng is not None else self._rng
+		elc = Network.TwoAlternativeElections(self._num_honest, self._num_adversaries, self.n, num_rounds, rng)
+		return elc.sybils_win(elc.majority_picks())
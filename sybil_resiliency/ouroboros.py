@@ -0,0 +1,145 @@
+import numpy as np
+from enum import Enum
+from typing import Tuple
+
+from network import Network
+
+
+class ForkStrategy(Enum):
+	"""
+	Stores symbols for the ways in which adversary-controlled slot leaders publish their blocks in Ouroboros.
+	"""
+	HONEST = 'honest'  # publish every block on the longest chain, like honest leaders do
+	WITHHOLD = 'withhold'  # extend a private fork and release it once it is at least as long as the public chain
+
+
+class OuroborosEpochs:
+	"""
+	A batch of independent Ouroboros epochs on one network, simulated slot by slot but vectorized over all slots.
+
+	Every slot has exactly one leader, drawn weighted by asset size; the leaders of many epochs are drawn at once. The
+	network is synchronous, honest leaders extend the longest chain, and the adversary is rushing: it sees honest
+	blocks first and wins ties between chains of equal length.
+
+	Every adversary attacks on its own, as its sybils do not cooperate with those of other adversaries. Each adversary
+	is therefore simulated against the same leaders, with the slots of all other adversaries acting honestly.
+
+	Under ``ForkStrategy.WITHHOLD``, the adversary keeps one private fork, extending it in each of its slots. Its lead
+	over the public chain follows the Lindley recursion ``lead = max(0, lead + 1)`` in adversarial slots and
+	``lead = max(0, lead - 1)`` in honest ones. Whenever an honest block arrives while the fork is not ahead, the
+	adversary releases the fork (winning the tie) and restarts it on top of the new block. All honest blocks since
+	the fork point are then orphaned. A fork that is still private when the epoch ends is never released, so it
+	orphans nothing and its blocks do not make it into the chain. The walk is computed for all slots at once, with a
+	cumulative sum and a running minimum.
+
+	Epochs are simulated in chunks of at most ``slots_per_chunk`` slots together, so that memory stays bounded however
+	many epochs are asked for; only the per-epoch results are kept.
+
+	Chain quality is the largest share of the blocks in the final chain that any one adversary attains. A common-prefix
+	violation of depth ``depth`` occurs if a released fork of any adversary orphans at least ``depth`` honest blocks.
+	"""
+
+	SLOTS_PER_EPOCH: int = 2160
+	COMMON_PREFIX_DEPTH: int = 6  # the number of blocks after which a block is considered settled
+	SLOTS_PER_CHUNK: int = 2 ** 20  # slots simulated together, i.e. a few hundred epochs of the default length
+
+	def __init__(
+			self,
+			net: Network,
+			num_epochs: int,
+			rng: np.random.Generator,
+			strategy: ForkStrategy = ForkStrategy.WITHHOLD,
+			slots_per_epoch: int = SLOTS_PER_EPOCH,
+			depth: int = COMMON_PREFIX_DEPTH,
+			slots_per_chunk: int = SLOTS_PER_CHUNK) -> None:
+		"""
+		Simulates a batch of epochs.
+
+		:param net: The network to run the epochs on.
+		:param num_epochs: The number of independent epochs.
+		:param rng: A random number generator to draw randomness from.
+		:param strategy: Optional. How adversarial leaders publish their blocks.
+		:param slots_per_epoch: Optional. The number of slots in an epoch.
+		:param depth: Optional. The number of orphaned honest blocks that makes up a common-prefix violation.
+		:param slots_per_chunk: Optional. The number of slots to simulate together, at least one epoch's worth.
+		"""
+		epochs_per_chunk: int = max(1, slots_per_chunk // slots_per_epoch)
+		self.sybil_chain_quality: np.ndarray = np.empty(shape=num_epochs, dtype=float)
+		self.common_prefix_violations: np.ndarray = np.empty(shape=num_epochs, dtype=bool)
+		for start in range(0, num_epochs, epochs_per_chunk):
+			stop: int = min(start + epochs_per_chunk, num_epochs)
+			self.sybil_chain_quality[start:stop], self.common_prefix_violations[start:stop] = \
+				OuroborosEpochs._simulate(net, stop - start, rng, strategy, slots_per_epoch, depth)
+
+	@staticmethod
+	def _simulate(
+			net: Network,
+			num_epochs: int,
+			rng: np.random.Generator,
+			strategy: ForkStrategy,
+			slots_per_epoch: int,
+			depth: int) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Simulates a chunk of epochs, all slots at once.
+
+		:param net: The network to run the epochs on.
+		:param num_epochs: The number of independent epochs.
+		:param rng: A random number generator to draw randomness from.
+		:param strategy: How adversarial leaders publish their blocks.
+		:param slots_per_epoch: The number of slots in an epoch.
+		:param depth: The number of orphaned honest blocks that makes up a common-prefix violation.
+		:return: Per epoch, the sybils' chain quality and whether the common prefix was violated.
+		"""
+		owners: np.ndarray = net.owner_of(net.draw_by_asset_size((num_epochs, slots_per_epoch), rng))
+		chain_quality: np.ndarray = np.zeros(shape=num_epochs, dtype=float)
+		violations: np.ndarray = np.zeros(shape=num_epochs, dtype=bool)
+		for adversary in np.unique(owners[owners >= 0]):
+			adversarial_slots: np.ndarray = owners == adversary
+			epochs: np.ndarray = np.flatnonzero(adversarial_slots.any(axis=1))  # the others are all honest
+			if strategy is ForkStrategy.HONEST:
+				adversary_quality: np.ndarray = adversarial_slots[epochs].sum(axis=1) / slots_per_epoch
+			else:
+				adversary_quality, adversary_violations = OuroborosEpochs._withhold(adversarial_slots[epochs], depth)
+				violations[epochs] |= adversary_violations
+			chain_quality[epochs] = np.maximum(chain_quality[epochs], adversary_quality)
+		return chain_quality, violations
+
+	@staticmethod
+	def _withhold(adversarial_slots: np.ndarray, depth: int) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Simulates one adversary withholding a private fork, with all other leaders acting honestly.
+
+		:param adversarial_slots: Per epoch and slot, whether the adversary leads the slot.
+		:param depth: The number of orphaned honest blocks that makes up a common-prefix violation.
+		:return: Per epoch, the adversary's chain quality and whether it violated the common prefix.
+		"""
+		num_epochs, num_slots = adversarial_slots.shape
+		slot_numbers: np.ndarray = np.arange(1, num_slots + 1, dtype=np.int32)
+		num_adversarial_so_far: np.ndarray = np.cumsum(adversarial_slots, axis=1, dtype=np.int32)
+		num_honest_so_far: np.ndarray = slot_numbers - num_adversarial_so_far
+		# the Lindley walk: a random walk minus its running minimum (floored at the start value 0)
+		walk: np.ndarray = num_adversarial_so_far - num_honest_so_far
+		lead: np.ndarray = walk - np.minimum(np.minimum.accumulate(walk, axis=1), 0)
+		# honest blocks arriving while the fork is not ahead make the adversary release it and fork anew
+		releases: np.ndarray = ~adversarial_slots
+		releases[:, 1:] &= lead[:, :-1] == 0
+		# a release orphans the honest blocks since the previous fork point; a fork point's own block survives
+		at_fork_point: np.ndarray = np.maximum.accumulate(num_honest_so_far * releases, axis=1)
+		orphaned: np.ndarray = (num_honest_so_far[:, 1:] - 1 - at_fork_point[:, :-1]) * releases[:, 1:]
+		violations: np.ndarray = orphaned.max(axis=1, initial=0) >= depth
+		# the chain holds the released forks, the honest blocks that triggered their release, and the public chain
+		# after the last release; the adversary's blocks since then stay private
+		num_releases: np.ndarray = releases.sum(axis=1)
+		num_released: np.ndarray = num_adversarial_so_far[np.arange(num_epochs), _last(releases)]
+		num_released[num_releases == 0] = 0
+		num_public: np.ndarray = num_honest_so_far[:, -1] - at_fork_point[:, -1]
+		return num_released / np.maximum(num_releases + num_released + num_public, 1), violations
+
+def _last(flags: np.ndarray) -> np.ndarray:
+	"""
+	Gives, per row, the index of the last set flag.
+
+	:param flags: A 2-D boolean array.
+	:return: Per row, the column of its last ``True`` entry, or the last column if there is none.
+	"""
+	return flags.shape[1] - 1 - np.argmax(flags[:, ::-1], axis=1)
@@ -0,0 +1,144 @@
+import importlib
+import numpy as np
+from types import ModuleType
+from typing import Dict, Optional, Tuple
+
+from network import ConsensusProtocol, Network
+
+
+# Every ``ConsensusProtocol`` is implemented by the module of this package named after its value. A module defines
+#
+#     sybils_win_rounds(net, num_rounds, coalition_size, rng, uniforms) -> np.ndarray
+#
+# and, if the protocol has a closed form,
+#
+#     sybils_win_probability(net, coalition_size) -> float
+#
+# Modules are imported on first use only, so running one protocol does not load the dependencies of the others.
+
+# protocols whose randomness is a set of weighted identity draws, which common random numbers can drive directly
+INVERSE_CDF_PROTOCOLS: Tuple[ConsensusProtocol, ...] = (
+	ConsensusProtocol.PROOF_OF_WORK, ConsensusProtocol.PROOF_OF_STAKE, ConsensusProtocol.PROOF_OF_ACTIVITY,
+	ConsensusProtocol.ALGORAND_PROOF)
+# protocols whose outcome depends on the size of a committee, which must then be specified
+COALITION_PROTOCOLS: Tuple[ConsensusProtocol, ...] = (
+	ConsensusProtocol.PROOF_OF_ACTIVITY, ConsensusProtocol.ALGORAND_PROOF)
+
+_modules: Dict[ConsensusProtocol, ModuleType] = {}
+
+
+def implementation(prt: ConsensusProtocol) -> ModuleType:
+	"""
+	Gives the module implementing a protocol, importing it on first use.
+
+	:param prt: The protocol.
+	:return: The module.
+	"""
+	if prt not in _modules:
+		try:
+			_modules[prt] = importlib.import_module('%s.%s' % (__name__, prt.value))
+		except ModuleNotFoundError as error:
+			if error.name != '%s.%s' % (__name__, prt.value):
+				raise  # the module exists, but one of its own imports is missing
+			raise NotImplementedError('Consensus protocol \'%s\' is not implemented (yet).' % (prt.value,)) from None
+	return _modules[prt]
+
+
+def _check_coalition_size(prt: ConsensusProtocol, coalition_size: Optional[int]) -> None:
+	"""
+	Raises if a coalition-dependent protocol lacks a coalition size.
+
+	:param prt: The protocol.
+	:param coalition_size: The coalition's number of identities, if any.
+	"""
+	if coalition_size is None and prt in COALITION_PROTOCOLS:
+		raise ValueError('Protocol \'%s\' requires a coalition size!' % (prt.value,))
+
+
+def sybils_win_rounds(
+		net: Network,
+		prt: ConsensusProtocol,
+		num_rounds: int,
+		coalition_size: Optional[int] = None,
+		rng: Optional[np.random.Generator] = None,
+		uniforms: Optional[np.ndarray] = None) -> np.ndarray:
+	"""
+	Determines, for a number of independent consensus rounds, whether sybils win each round.
+
+	:param net: The network to simulate with.
+	:param prt: The protocol to run the consensus mechanism with.
+	:param num_rounds: The number of consensus rounds to simulate.
+	:param coalition_size: Only required for coalition-dependent protocols. The coalition's number of identities.
+	:param rng: A random number generator to draw randomness from.
+	:param uniforms: Optional. Pre-drawn variates in ``[0, 1)``; ignored by all but the ``INVERSE_CDF_PROTOCOLS``.
+	:return: A boolean array of length ``num_rounds``. Entry ``i`` states whether the sybils won round ``i``.
+	"""
+	rng = rng if rng is not None else np.random.default_rng()
+	if uniforms is not None and prt not in INVERSE_CDF_PROTOCOLS:
+		uniforms = None
+	_check_coalition_size(prt, coalition_size)
+	return implementation(prt).sybils_win_rounds(net, num_rounds, coalition_size, rng, uniforms)
+
+
+def sybils_win_probability(
+		net: Network,
+		prt: ConsensusProtocol,
+		coalition_size: Optional[int] = None) -> Optional[float]:
+	"""
+	Gives the exact probability that sybils win a round of consensus, if the protocol has a closed form.
+
+	:param net: The network to evaluate.
+	:param prt: The protocol to evaluate.
+	:param coalition_size: Only required for coalition-dependent protocols. The coalition's number of identities.
+	:return: The probability, or ``None`` if there is no closed form for the protocol.
+	"""
+	_check_coalition_size(prt, coalition_size)
+	module: ModuleType = implementation(prt)
+	if not hasattr(module, 'sybils_win_probability'):
+		return None
+	return module.sybils_win_probability(net, coalition_size)
+
+
+def binomial_pmf(n: int, p: float) -> np.ndarray:
+	"""
+	Gives the probability mass function of a binomial distribution.
+
+	:param n: The number of trials.
+	:param p: The success probability per trial.
+	:return: An array of length ``n + 1``. Entry ``k`` is the probability of ``k`` successes.
+	"""
+	successes: np.ndarray = np.arange(1, n + 1)
+	log_binomial_coefficients: np.ndarray = \
+		np.concatenate(([0.0], np.cumsum(np.log(n - successes + 1) - np.log(successes))))
+	ks: np.ndarray = np.arange(n + 1)
+	with np.errstate(divide='ignore'):
+		return np.exp(log_binomial_coefficients + ks * np.log(p) + (n - ks) * np.log1p(-p))
+
+
+def two_alternative_win_probability(net: Network, probability_picking_a) -> float:
+	"""
+	Gives the probability that a single adversary's sybils overturn the honest majority in a two-alternative election.
+
+	Conditions on the number of honest votes for 'a' (binomially distributed) and on the sybils' choice (each
+	alternative equally likely).
+
+	:param net: The network to evaluate.
+	:param probability_picking_a: Maps arrays of the votes for 'a' and for 'b' to the probability of electing 'a'.
+	:return: The probability.
+	"""
+	if net.num_adversaries > 1:
+		raise ValueError(
+			'A two-alternative election requires at most one adversary (got %d).' % (net.num_adversaries,))
+	num_honest: int = net.num_honest
+	honest_votes_a: np.ndarray = np.arange(num_honest + 1)
+	honest_votes_b: np.ndarray = num_honest - honest_votes_a
+	honest_majority_choice: np.ndarray = (honest_votes_b > 0).astype(int)
+	num_sybils: int = net.n - num_honest
+	probability: np.ndarray = np.zeros(shape=num_honest + 1, dtype=float)
+	for sybil_choice in (0, 1):
+		votes_a: np.ndarray = honest_votes_a + num_sybils * (sybil_choice == 0)
+		votes_b: np.ndarray = honest_votes_b + num_sybils * (sybil_choice == 1)
+		picking_a: np.ndarray = probability_picking_a(votes_a, votes_b)
+		probability_picking_sybil_choice: np.ndarray = picking_a if sybil_choice == 0 else 1.0 - picking_a
+		probability += 0.5 * probability_picking_sybil_choice * (honest_majority_choice != sybil_choice)
+	return float(np.sum(binomial_pmf(num_honest, 0.5) * probability))
@@ -0,0 +1,25 @@
+import numpy as np
+from typing import Optional
+
+from network import Network
+from protocols import poa
+
+
+# Algorand: a soft voting round and a certifying voting round, each decided by a proof-of-activity committee.
+
+def sybils_win_rounds(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator,
+		uniforms: Optional[np.ndarray]) -> np.ndarray:
+	soft, certify = \
+		(uniforms[:, :coalition_size], uniforms[:, coalition_size:2 * coalition_size]) \
+		if uniforms is not None else (None, None)
+	return \
+		poa.sybils_win_rounds(net, num_rounds, coalition_size, rng, soft) & \
+		poa.sybils_win_rounds(net, num_rounds, coalition_size, rng, certify)
+
+
+def sybils_win_probability(net: Network, coalition_size: Optional[int]) -> float:
+	return poa.sybils_win_probability(net, coalition_size) ** 2
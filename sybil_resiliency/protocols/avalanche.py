@@ -0,0 +1,16 @@
+import numpy as np
+from typing import Optional
+
+from network import Network
+from snowball import SnowballConsensus
+
+
+# Avalanche: every round is a full Snowball run, in which the sybils win unless the honest nodes agree.
+
+def sybils_win_rounds(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator,
+		uniforms: Optional[np.ndarray]) -> np.ndarray:
+	return SnowballConsensus(net, num_rounds, rng).run()
@@ -0,0 +1,30 @@
+import numpy as np
+from typing import Optional
+
+from network import Network
+from protocols import con_two
+
+
+# Conitzer's many-alternative protocol: two identities are drawn uniformly; the sybils win if both belong to the same
+# adversary, or, if at least one is a sybil, as in the two-alternative protocol.
+
+def sybils_win_rounds(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator,
+		uniforms: Optional[np.ndarray]) -> np.ndarray:
+	identities: np.ndarray = rng.integers(low=0, high=net.n, size=(num_rounds, 2))  # with replacement for now
+	same_user: np.ndarray = net.sybils_belong_to_same_user(identities)
+	both_honest: np.ndarray = ~net.is_sybil(identities).any(axis=1)
+	two_alt: np.ndarray = con_two.sybils_win_rounds(net, num_rounds, coalition_size, rng, None)
+	return same_user | (~both_honest & two_alt)
+
+
+def sybils_win_probability(net: Network, coalition_size: Optional[int]) -> float:
+	identity_shares: np.ndarray = net.sybils_per_adversary / net.n
+	probability_same_user: float = float(np.sum(identity_shares ** 2))
+	probability_both_honest: float = (net.num_honest / net.n) ** 2
+	return \
+		probability_same_user + (1.0 - probability_same_user - probability_both_honest) * \
+		con_two.sybils_win_probability(net, coalition_size)
@@ -0,0 +1,22 @@
+import numpy as np
+from typing import Optional
+
+from network import Network
+
+
+# Conitzer's two-alternative protocol: unless all votes agree, a uniformly drawn identity decides.
+
+def sybils_win_rounds(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator,
+		uniforms: Optional[np.ndarray]) -> np.ndarray:
+	# the number of 1-votes among n fair binary votes is binomially distributed
+	unanimous: np.ndarray = np.isin(rng.binomial(n=net.n, p=0.5, size=num_rounds), (0, net.n))
+	return ~unanimous & net.is_sybil(rng.integers(low=0, high=net.n, size=num_rounds))
+
+
+def sybils_win_probability(net: Network, coalition_size: Optional[int]) -> float:
+	probability_unanimous: float = 2.0 * 0.5 ** net.n
+	return (1.0 - probability_unanimous) * (net.n - net.num_honest) / net.n
@@ -0,0 +1,22 @@
+import numpy as np
+from typing import Optional
+
+from network import Network
+from protocols import two_alternative_win_probability
+
+
+# FNP-2: a two-alternative election in which voters pay a cost per vote, resolved by ``Network.sybils_win_fnp2_rounds``.
+
+def sybils_win_rounds(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator,
+		uniforms: Optional[np.ndarray]) -> np.ndarray:
+	return net.sybils_win_fnp2_rounds(num_rounds, rng)
+
+
+def sybils_win_probability(net: Network, coalition_size: Optional[int]) -> float:
+	return two_alternative_win_probability(
+		net, lambda votes_a, votes_b:
+			Network.TwoAlternativeElections.fnp2_probability_picking_a(votes_a, votes_b, net.cost))
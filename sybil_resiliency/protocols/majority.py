@@ -0,0 +1,20 @@
+import numpy as np
+from typing import Optional
+
+from network import Network
+from protocols import two_alternative_win_probability
+
+
+# Majority: a two-alternative election won by the alternative with the most votes.
+
+def sybils_win_rounds(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator,
+		uniforms: Optional[np.ndarray]) -> np.ndarray:
+	return net.sybils_win_majority_rounds(num_rounds, rng)
+
+
+def sybils_win_probability(net: Network, coalition_size: Optional[int]) -> float:
+	return two_alternative_win_probability(net, lambda votes_a, votes_b: (votes_a > votes_b).astype(float))
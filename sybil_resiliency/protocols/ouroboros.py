@@ -0,0 +1,27 @@
+import numpy as np
+from typing import Optional
+
+from network import Network
+from ouroboros import OuroborosEpochs
+
+
+# Ouroboros: slot leaders are drawn by stake, and persistence is achieved by the longest chain, which forks can
+# overturn. Every round is an epoch, which the sybils win by a common-prefix violation. The coalition size, if given,
+# is the settlement depth: the number of honest blocks a released fork must orphan to violate the common prefix.
+
+def epochs(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator) -> OuroborosEpochs:
+	depth: int = coalition_size if coalition_size is not None else OuroborosEpochs.COMMON_PREFIX_DEPTH
+	return OuroborosEpochs(net, num_rounds, rng, depth=depth)
+
+
+def sybils_win_rounds(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator,
+		uniforms: Optional[np.ndarray]) -> np.ndarray:
+	return epochs(net, num_rounds, coalition_size, rng).common_prefix_violations
@@ -0,0 +1,23 @@
+import numpy as np
+from typing import Optional
+
+from network import Network
+
+
+# Proof of activity: a committee of ``coalition_size`` members is drawn weighted by asset size, and the sybils win if
+# all members belong to the same adversary.
+
+def sybils_win_rounds(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator,
+		uniforms: Optional[np.ndarray]) -> np.ndarray:
+	if uniforms is not None:
+		return net.sybils_belong_to_same_user(net.identities_by_asset_size(uniforms[:, :coalition_size]))
+	return net.sybils_belong_to_same_user(net.draw_by_asset_size((num_rounds, coalition_size), rng))
+
+
+def sybils_win_probability(net: Network, coalition_size: Optional[int]) -> float:
+	# every one of the (independently drawn) committee members must belong to the same adversary
+	return float(np.sum(net.adversary_shares(net.asset_sizes) ** coalition_size))
@@ -0,0 +1,21 @@
+import numpy as np
+from typing import Optional
+
+from network import Network
+
+
+# Proof of stake: the block's leader is drawn weighted by asset size.
+
+def sybils_win_rounds(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator,
+		uniforms: Optional[np.ndarray]) -> np.ndarray:
+	if uniforms is not None:
+		return net.is_sybil(net.identities_by_asset_size(uniforms[:, 0]))
+	return net.is_sybil(net.draw_by_asset_size(num_rounds, rng))
+
+
+def sybils_win_probability(net: Network, coalition_size: Optional[int]) -> float:
+	return float(net.asset_sizes[net.num_honest:].sum() / net.asset_sizes.sum())
@@ -0,0 +1,21 @@
+import numpy as np
+from typing import Optional
+
+from network import Network
+
+
+# Proof of work: the block's leader is drawn weighted by computing power.
+
+def sybils_win_rounds(
+		net: Network,
+		num_rounds: int,
+		coalition_size: Optional[int],
+		rng: np.random.Generator,
+		uniforms: Optional[np.ndarray]) -> np.ndarray:
+	if uniforms is not None:
+		return net.is_sybil(net.identities_by_computing_power(uniforms[:, 0]))
+	return net.is_sybil(net.draw_by_computing_power(num_rounds, rng))
+
+
+def sybils_win_probability(net: Network, coalition_size: Optional[int]) -> float:
+	return float(net.computing_powers[net.num_honest:].sum() / net.computing_powers.sum())
@@ -1,287 +1,537 @@
+import json
 import numpy as np
 import os
-import pandas as pd
 import time
-from collections import Counter
+import warnings
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
+import protocols as registry
+from cache import ResultCache
+from network import ConsensusProtocol, Network
+from protocols import INVERSE_CDF_PROTOCOLS
 
-class ConsensusProtocol(Enum):
+if TYPE_CHECKING:
+	import pandas as pd  # imported on first use, as only saving results and paired differences need it
+
+
+class Aggregation(Enum):
+	"""
+	Stores symbols for the ways in which a ``SybilResiliencyExperiment`` can keep the outcomes of its rounds.
+	"""
+	TRACE = 'trace'  # every round's outcome, one byte each
+	PACKED = 'packed'  # every round's outcome, one bit each, optionally memory-mapped
+	COUNTS = 'counts'  # the number of sybil wins per protocol and episode
+	MOMENTS = 'moments'  # only the running mean and variance of the per-episode win rates
+
+
+def sybils_win_consensus_round(
+		net: Network,
+		prt: ConsensusProtocol,
+		coalition_size: Optional[int] = None,
+		rng: Optional[np.random.Generator] = None) -> bool:
+	"""
+	Determines whether sybils (from one adversary) win a round of consensus in the specified consensus protocol.
+
+	This is a convenience wrapper around ``sybils_win_consensus_rounds`` for a single round.
+
+	:param net: The network to simulate with.
+	:param prt: The protocol to run the consensus mechanism with.
+	:param coalition_size: Only required for coalition-dependent protocols. The coalition's number of identities.
+	:param rng: A random number generator to draw randomness from.
+	:return: The question's answer.
+	"""
+	return bool(sybils_win_consensus_rounds(net, prt, 1, coalition_size, rng)[0])
+
+
+def sybils_win_consensus_rounds(
+		net: Network,
+		prt: ConsensusProtocol,
+		num_rounds: int,
+		coalition_size: Optional[int] = None,
+		rng: Optional[np.random.Generator] = None,
+		uniforms: Optional[np.ndarray] = None) -> np.ndarray:
 	"""
-	Stores symbols for referring to consensus protocols in cryptocurrencies and beyond.
+	Determines, for a number of independent consensus rounds, whether sybils (from one adversary) win each round.
+
+	All rounds are simulated at once. ``ConsensusProtocol.PROOF_OF_ACTIVITY`` and ``ConsensusProtocol.ALGORAND_PROOF``
+	require ``coalition_size`` to be specified. For ``ConsensusProtocol.OUROBOROS``, every round is an epoch, which
+	the sybils win by a common-prefix violation, with ``coalition_size`` as the settlement depth if given. The
+	protocol's implementation, a module of the ``protocols`` package, is imported on first use.
+
+	:param net: The network to simulate with.
+	:param prt: The protocol to run the consensus mechanism with.
+	:param num_rounds: The number of consensus rounds to simulate.
+	:param coalition_size: Only required for coalition-dependent protocols. The coalition's number of identities.
+	:param rng: A random number generator to draw randomness from.
+	:param uniforms: Optional. Only used by the ``INVERSE_CDF_PROTOCOLS``. Pre-drawn variates in ``[0, 1)``, of shape
+		``(num_rounds, width)``, to map to the weighted draws instead of drawing from ``rng``. Proof of work and proof of
+		stake use the first column, proof of activity the first ``coalition_size`` columns, and Algorand twice as
+		many.
+	:return: A boolean array of length ``num_rounds``. Entry ``i`` states whether the sybils won round ``i``.
 	"""
-	PROOF_OF_WORK = 'pow'
-	PROOF_OF_STAKE = 'pos'
-	PROOF_OF_ACTIVITY = 'poa'
-	ALGORAND_PROOF = 'algorand'
-	OUROBOROS = 'ouroboros'
-	AVALANCHE = 'avalanche'
-	FNP2 = 'fnp2'
-	CONITZER_TWO_ALT = 'con_two'
-	CONITZER_MANY_ALT = 'con_many'
-	MAJORITY = 'majority'
-
-
-class Network:
+	return registry.sybils_win_rounds(net, prt, num_rounds, coalition_size, rng, uniforms)
+
+
+def sybils_win_probability(
+		net: Network,
+		prt: ConsensusProtocol,
+		coalition_size: Optional[int] = None) -> Optional[float]:
+	"""
+	Gives the exact probability that sybils (from one adversary) win a round of consensus in the specified protocol.
+
+	The probability is the one ``sybils_win_consensus_rounds`` samples from, given the network. Protocols without a
+	closed form yield ``None``; for those, the outcome has to be estimated by sampling.
+
+	:param net: The network to evaluate.
+	:param prt: The protocol to evaluate.
+	:param coalition_size: Only required for coalition-dependent protocols. The coalition's number of identities.
+	:return: The probability, or ``None`` if there is no closed form for the protocol.
 	"""
-	An abstract model of a peer-to-peer cryptocurrency network containing honest users as well as sybils.
+	return registry.sybils_win_probability(net, prt, coalition_size)
+
+
+def _simulate_episode(
+		num_honest: int,
+		num_adversary: int,
+		num_iterations: int,
+		protocols: Tuple[ConsensusProtocol, ...],
+		coalition_size: Optional[int],
+		cost: float,
+		exact: bool,
+		keep_trace: bool,
+		rng: np.random.Generator,
+		timings: Optional[np.ndarray] = None,
+		common_random_numbers: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray], float]:
 	"""
+	Simulates a single episode: one freshly generated network on which every protocol runs its consensus rounds.
+
+	In exact mode, protocols with a closed-form win probability are not sampled. Their expected number of wins is
+	reported instead.
 
-	SYBILS_PER_ADVERSARY_MIN_MAX: Tuple[int, int] = (10, 20)  # both ends inclusive
-	COMPUTING_POWER_ALPHA: float = float(np.log(5) / np.log(4))  # to get close to the 80-20 rule
-	ASSET_SIZE_ALPHA: float = float(np.log(5) / np.log(4))
-	COST: float = float(0.15)  # Conitzer 0.15 cost
-
-	class TwoAlternativeElection:
-
-		ALTERNATIVES: Tuple[str, str] = ('a', 'b')
-
-		def __init__(self, num_honest: int, num_adversary: int, n: int, rng: np.random.Generator) -> None:
-			if num_adversary > 1:
-				raise ValueError(
-					'A two-alternative election requires at most one adversary (got %d).' %
-					(num_adversary,))
-			self._num_honest = num_honest
-			self._num_adversary = num_adversary
-			self._n = n
-			self._rng = rng
-			self.number_votes_a: int
-			self.number_votes_b: int
-			self.honest_majority_choice: str
-			self.sybil_choice: str
-			self._initialise_election()
-
-		def _initialise_election(self) -> None:
-			choices: np.ndarray = self._rng.choice(
-				a=Network.TwoAlternativeElection.ALTERNATIVES, size=self._num_honest,
-				replace=True)
-			ctr = Counter(choices)
-			self.honest_majority_choice = max(ctr)
-			num_sybils = self._n - self._num_honest
-			self.sybil_choice: str = self._rng.choice(a=Network.TwoAlternativeElection.ALTERNATIVES)
-			if self.sybil_choice == Network.TwoAlternativeElection.ALTERNATIVES[0]:
-				self.number_votes_a = num_sybils + ctr[Network.TwoAlternativeElection.ALTERNATIVES[0]]
-				self.number_votes_b = ctr[Network.TwoAlternativeElection.ALTERNATIVES[1]]
-			else:  # preference of sybils for B
-				self.number_votes_a = ctr[Network.TwoAlternativeElection.ALTERNATIVES[0]]
-				self.number_votes_b = num_sybils + ctr[Network.TwoAlternativeElection.ALTERNATIVES[1]]
+	With common random numbers, the protocols share their randomness within the episode. The
+	``INVERSE_CDF_PROTOCOLS`` map one shared pool of uniform variates per round to their draws; every other protocol
+	starts a generator from one shared seed. Outcomes of different protocols are then positively correlated, which
+	reduces the variance of their differences.
+
+	If ``timings`` is given, the clock is read around the network construction and around every protocol. Otherwise,
+	no time is measured at all.
+
+	:param num_honest: The number of honest users.
+	:param num_adversary: The number of adversaries.
+	:param num_iterations: The number of consensus rounds per protocol.
+	:param protocols: The consensus protocols to run.
+	:param coalition_size: Only required for coalition-dependent protocols. The coalition's number of identities.
+	:param cost: The per-vote cost used by FNP-2.
+	:param exact: Whether to use closed-form win probabilities where available.
+	:param keep_trace: Whether to return the bit-packed outcomes of the individual rounds as well.
+	:param rng: A random number generator to draw randomness from.
+	:param timings: Optional. An array of shape ``(len(protocols) + 1,)`` to add the seconds spent per protocol to,
+		followed by the seconds spent constructing the network.
+	:param common_random_numbers: Optional. Whether the protocols share their randomness.
+	:return: The (expected) win counts, of shape ``(len(protocols),)``, the packed trace (or ``None``), and the
+		sybils' mean chain quality over the Ouroboros epochs (or NaN, if Ouroboros was not run).
+	"""
+	counts: np.ndarray = np.zeros(shape=len(protocols), dtype=float)
+	chain_quality: float = np.nan
+	packed: Optional[np.ndarray] = \
+		np.zeros(shape=(len(protocols), (num_iterations + 7) // 8), dtype=np.uint8) if keep_trace else None
+	tic: float = time.perf_counter() if timings is not None else 0.0
+	net = Network(num_honest, num_adversary, rng=rng, cost=cost)
+	uniforms: Optional[np.ndarray] = None
+	shared_seed: Optional[int] = None
+	if common_random_numbers:
+		uniforms = rng.random(size=(num_iterations, max(1, 2 * (coalition_size or 0))))
+		shared_seed = int(rng.integers(np.iinfo(np.int64).max))
+	if timings is not None:
+		toc: float = time.perf_counter()
+		timings[-1] += toc - tic
+		tic = toc
+	for prt_index, prt in enumerate(protocols):
+		probability: Optional[float] = sybils_win_probability(net, prt, coalition_size) if exact else None
+		if probability is not None:
+			counts[prt_index] = probability * num_iterations
+		else:
+			prt_rng: np.random.Generator = \
+				np.random.default_rng(shared_seed) if common_random_numbers and prt not in INVERSE_CDF_PROTOCOLS else rng
+			if prt is ConsensusProtocol.OUROBOROS:
+				# the same simulation as in ``sybils_win_consensus_rounds``, which hides the chain quality
+				epochs = registry.implementation(prt).epochs(net, num_iterations, coalition_size, prt_rng)
+				wins: np.ndarray = epochs.common_prefix_violations
+				chain_quality = float(epochs.sybil_chain_quality.mean())
+			else:
+				wins: np.ndarray = \
+					sybils_win_consensus_rounds(net, prt, num_iterations, coalition_size, prt_rng, uniforms)
+			counts[prt_index] = wins.sum()
+			if packed is not None:
+				packed[prt_index, :] = np.packbits(wins)
+		if timings is not None:
+			toc = time.perf_counter()
+			timings[prt_index] += toc - tic
+			tic = toc
+	return counts, packed, chain_quality
+
+
+def _simulate_episodes(
+		num_honest: int,
+		num_adversary: int,
+		num_iterations: int,
+		protocols: Tuple[ConsensusProtocol, ...],
+		coalition_size: Optional[int],
+		cost: float,
+		exact: bool,
+		seed_sequences: List[np.random.SeedSequence],
+		keep_trace: bool,
+		timed: bool = False,
+		common_random_numbers: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray], np.ndarray]:
+	"""
+	Simulates a consecutive range of episodes, each with its own random stream. Used as a process pool task.
+
+	The outcomes are returned in compact form: as win counts, and as a bit-packed trace only if it is needed.
+
+	:param num_honest: The number of honest users.
+	:param num_adversary: The number of adversaries.
+	:param num_iterations: The number of consensus rounds per protocol.
+	:param protocols: The consensus protocols to run.
+	:param coalition_size: Only required for coalition-dependent protocols. The coalition's number of identities.
+	:param cost: The per-vote cost used by FNP-2.
+	:param exact: Whether to use closed-form win probabilities where available.
+	:param seed_sequences: One seed sequence per episode in the range.
+	:param keep_trace: Whether to return the bit-packed outcomes of the individual rounds as well.
+	:param timed: Whether to measure the time spent per protocol and on network construction.
+	:param common_random_numbers: Whether the protocols share their randomness within each episode.
+	:return: The win counts, of shape ``(len(protocols), len(seed_sequences))``, the packed trace (or ``None``), the
+		summed timings as laid out by ``_simulate_episode`` (or ``None``), and the chain quality per episode.
+	"""
+	counts: np.ndarray = np.zeros(shape=(len(protocols), len(seed_sequences)), dtype=float)
+	packed: Optional[np.ndarray] = \
+		np.zeros(shape=(len(protocols), len(seed_sequences), (num_iterations + 7) // 8), dtype=np.uint8) \
+		if keep_trace else None
+	timings: Optional[np.ndarray] = np.zeros(shape=len(protocols) + 1) if timed else None
+	chain_quality: np.ndarray = np.empty(shape=len(seed_sequences))
+	for epi, seed_sequence in enumerate(seed_sequences):
+		episode_counts, episode_packed, chain_quality[epi] = _simulate_episode(
+			num_honest, num_adversary, num_iterations, protocols, coalition_size, cost, exact, keep_trace,
+			np.random.default_rng(seed_sequence), timings, common_random_numbers)
+		counts[:, epi] = episode_counts
+		if packed is not None:
+			packed[:, epi, :] = episode_packed
+	return counts, packed, timings, chain_quality
+
+
+class WinAggregator:
+	"""
+	Keeps the sybils' wins of a ``SybilResiliencyExperiment`` in the form its ``Aggregation`` mode asks for.
+
+	The running mean and variance of the per-episode win rates are maintained in every mode.
+	"""
 
 	def __init__(
 			self,
-			num_honest: int,
-			num_adversary: int,
-			sybils_per_adversary: Optional[Tuple[int]] = None,
-			rng: Optional[np.random.Generator] = None) -> None:
+			num_protocols: int,
+			num_episodes: int,
+			num_iterations: int,
+			mode: Aggregation = Aggregation.TRACE,
+			trace_path: Optional[str] = None) -> None:
 		"""
-		Constructs a network.
+		Constructs a win aggregator.
 
-		:param num_honest: The number of honest users.
-		:param num_adversary: The number of adversaries. These are single users that possess one or more sybils.
-		:param sybils_per_adversary: Optional. A listing of the number of sybils each adversary possesses.
-		:param rng: Optional. A random number generator to generate the network with.
+		:param num_protocols: The number of protocols.
+		:param num_episodes: The number of episodes.
+		:param num_iterations: The number of consensus rounds per episode.
+		:param mode: The aggregation mode.
+		:param trace_path: Optional. Only used in ``Aggregation.PACKED`` mode. A '.npy' file to memory-map the
+			packed trace to, instead of keeping it in memory.
 		"""
-		self._num_honest = num_honest
-		self._num_adversaries = num_adversary
-		self._rng = rng if rng is not None else np.random.default_rng()
-		if sybils_per_adversary is None:
-			self._sybils_per_adversary: List[int] = list(self._rng.integers(
-				low=Network.SYBILS_PER_ADVERSARY_MIN_MAX[0],
-				high=Network.SYBILS_PER_ADVERSARY_MIN_MAX[1] + 1,
-				size=self._num_adversaries))
-		else:
-			self._sybils_per_adversary = sybils_per_adversary
-		self.n: int = self._num_honest + int(np.sum(self._sybils_per_adversary))
-		self.computing_powers = self._user_computing_powers()
-		self.asset_sizes = self._user_asset_sizes()
+		self.mode = mode
+		self._num_iterations = num_iterations
+		# (expected) numbers of wins; fractional in exact mode
+		self.counts: Optional[np.ndarray] = \
+			np.full(shape=(num_protocols, num_episodes), fill_value=np.nan) if mode is not Aggregation.MOMENTS else None
+		self.trace: Optional[np.ndarray] = None
+		if mode is Aggregation.TRACE:
+			self.trace = np.zeros(shape=(num_protocols, num_episodes, num_iterations), dtype=bool)
+		elif mode is Aggregation.PACKED:
+			shape: Tuple[int, int, int] = (num_protocols, num_episodes, (num_iterations + 7) // 8)
+			self.trace = \
+				np.lib.format.open_memmap(trace_path, mode='w+', dtype=np.uint8, shape=shape) \
+				if trace_path is not None else np.zeros(shape=shape, dtype=np.uint8)
+		self.num_recorded: np.ndarray = np.zeros(shape=num_protocols, dtype=np.int64)
+		self._mean: np.ndarray = np.zeros(shape=num_protocols, dtype=float)
+		self._m2: np.ndarray = np.zeros(shape=num_protocols, dtype=float)  # summed squared deviations
+
+	@property
+	def keeps_trace(self) -> bool:
+		"""
+		Determines whether the outcomes of the individual rounds are kept.
 
-	def _distributed_across_sybils(
-				self,
-				adversary_index: int,
-				distribution_fn: Callable,
-				params: Dict[str, Any]) -> List[float]:
+		:return: The question's answer.
 		"""
-		Yields some asset of an adversary, spread out uniformly over their sybils.
+		return self.mode in (Aggregation.TRACE, Aggregation.PACKED)
 
-		:param adversary_index: The index characterising the adversary.
-		:param distribution_fn: The distribution function with which to generate the total amount of the asset.
-		:param params: The parameters to supply to the distribution function.
-		:return: A list containing, per sybil, their respective share of the asset.
+	def record(
+			self,
+			first_episode: int,
+			counts: np.ndarray,
+			packed_trace: Optional[np.ndarray] = None,
+			protocol_indices: Optional[np.ndarray] = None) -> None:
 		"""
-		num_sybils: int = self._sybils_per_adversary[adversary_index]
-		power: float = distribution_fn(**params)
-		return num_sybils * [power / num_sybils]
+		Records the outcomes of a consecutive range of episodes.
 
-	def _user_computing_powers(self) -> List[float]:
+		:param first_episode: The index of the first episode in the range.
+		:param counts: The (expected) win counts, of shape ``(num_protocols, num_episodes_in_range)``.
+		:param packed_trace: Only required if the trace is kept. The bit-packed outcomes of the individual rounds.
+		:param protocol_indices: Optional. The protocols the rows of ``counts`` refer to. All protocols by default.
 		"""
-		Gives a list of the computing power each identity has.
+		prt: Union[slice, np.ndarray] = protocol_indices if protocol_indices is not None else slice(None)
+		episodes: slice = slice(first_episode, first_episode + counts.shape[1])
+		if self.counts is not None:
+			self.counts[prt, episodes] = counts
+		if self.mode is Aggregation.TRACE:
+			self.trace[prt, episodes, :] = \
+				np.unpackbits(packed_trace, axis=2, count=self._num_iterations).astype(bool)
+		elif self.mode is Aggregation.PACKED:
+			self.trace[prt, episodes, :] = packed_trace
+		# merge the batch's moments into the running ones (Chan et al.'s parallel algorithm)
+		rates: np.ndarray = counts / self._num_iterations
+		num_batch: int = rates.shape[1]
+		mean_batch: np.ndarray = rates.mean(axis=1)
+		m2_batch: np.ndarray = ((rates - mean_batch[:, None]) ** 2).sum(axis=1)
+		num_recorded: np.ndarray = self.num_recorded[prt]
+		num_total: np.ndarray = num_recorded + num_batch
+		delta: np.ndarray = mean_batch - self._mean[prt]
+		self._mean[prt] += delta * num_batch / num_total
+		self._m2[prt] += m2_batch + delta ** 2 * num_recorded * num_batch / num_total
+		self.num_recorded[prt] = num_total
+
+	def mean(self) -> np.ndarray:
+		"""
+		Gives, per protocol, the mean of the per-episode win rates.
 
-		:return: The list.
+		:return: The means.
 		"""
-		out: List[float] = [self._rng.pareto(a=Network.COMPUTING_POWER_ALPHA) for _ in range(self._num_honest)]
-		for adversary_index in range(self._num_adversaries):
-			# each adversary must spread out their total computing power over their sybils
-			out += \
-				self._distributed_across_sybils(adversary_index, self._rng.pareto, {'a': Network.COMPUTING_POWER_ALPHA})
-		return out
+		return self._mean.copy()
 
-	def _user_asset_sizes(self) -> List[float]:
+	def variance(self) -> np.ndarray:
 		"""
-		Gives a list which, for each identity, states the size of their cryptocurrency wallet.
+		Gives, per protocol, the sample variance of the per-episode win rates.
 
-		:return: The list.
+		:return: The variances. ``NaN`` for protocols with fewer than two episodes.
 		"""
-		out: List[float] = [self._rng.pareto(a=Network.ASSET_SIZE_ALPHA) for _ in range(self._num_honest)]
-		for adversary_index in range(self._num_adversaries):
-			out += self._distributed_across_sybils(adversary_index, self._rng.pareto, {'a': Network.ASSET_SIZE_ALPHA})
-		return out
+		with np.errstate(invalid='ignore', divide='ignore'):
+			return np.where(self.num_recorded > 1, self._m2 / (self.num_recorded - 1), np.nan)
 
-	def is_sybil(self, identity_index: int) -> bool:
+	def half_width(self, confidence: float) -> np.ndarray:
 		"""
-		Determines whether the identity associated with the supplied index is a sybil.
+		Gives, per protocol, the half-width of the normal-approximation confidence interval of the mean win rate.
 
-		:param identity_index: The index associated with the identity.
-		:return: The question's answer.
+		:param confidence: The confidence level, such as 0.95.
+		:return: The half-widths. ``NaN`` for protocols with fewer than two episodes.
 		"""
-		return identity_index >= self._num_honest
+		z: float = NormalDist().inv_cdf((1.0 + confidence) / 2.0)
+		with np.errstate(invalid='ignore', divide='ignore'):
+			return z * np.sqrt(self.variance() / self.num_recorded)
 
-	def sybils_belong_to_same_user(self, identity_indices: List[int]) -> bool:
+	def paired_differences(self, confidence: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
 		"""
-		Determines whether the identities associated with the supplied indices are sybils from one single adversary.
+		Gives, per pair of protocols, the mean of the per-episode differences of their win rates, with the half-width
+		of its normal-approximation confidence interval. Only episodes in which both protocols ran are paired.
 
-		This method also checks whether any of the supplied indices is not a sybil in the first place. If such a
-		situation occurs, this method automatically returns with ``False``.
+		:param confidence: The confidence level, such as 0.95.
+		:return: The mean differences, half-widths and numbers of paired episodes, each of shape
+			``(num_protocols, num_protocols)``. Entry ``[i, j]`` refers to protocol ``i`` minus protocol ``j``.
+		"""
+		rates: np.ndarray = self.episode_win_rates()
+		differences: np.ndarray = rates[:, None, :] - rates[None, :, :]
+		num_paired: np.ndarray = np.sum(~np.isnan(differences), axis=2)
+		z: float = NormalDist().inv_cdf((1.0 + confidence) / 2.0)
+		with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+			warnings.simplefilter('ignore', category=RuntimeWarning)  # pairs without (enough) episodes give NaN
+			mean: np.ndarray = np.nanmean(differences, axis=2)
+			half_width: np.ndarray = z * np.sqrt(np.nanvar(differences, axis=2, ddof=1) / num_paired)
+		return mean, half_width, num_paired
+
+	def episode_win_rates(self) -> np.ndarray:
+		"""
+		Gives, per protocol and episode, the fraction of rounds the sybils won.
 
-		:param identity_indices: The indices for the identities.
-		:return: The question's answer.
+		:return: An array of shape ``(num_protocols, num_episodes)``. ``NaN`` for episodes a protocol skipped.
 		"""
-		start_index: int = self._num_honest
-		end_index: int  # itself exclusive
-		for adv_num_syb in self._sybils_per_adversary:
-			end_index = start_index + adv_num_syb
-			all_correct: bool = True
-			for ide in identity_indices:
-				if ide < start_index or ide >= end_index:
-					# identity is an honest user or a sybil from a different user
-					all_correct = False
-					break
-			if all_correct:
-				return True
-			start_index += adv_num_syb  # Not correct? Continue to next set of sybils.
-		return False
+		if self.counts is None:
+			raise ValueError('Aggregation mode \'%s\' does not keep per-episode results.' % (self.mode.value,))
+		return self.counts / self._num_iterations
 
-	def network_reached_unanimous_two_alternative_decision(self) -> bool:
+	def outcomes(self) -> np.ndarray:
 		"""
-		Determines whether the network voted unanimously for one alternative among two.
+		Gives the outcomes of all individual rounds.
 
-		Note that if a unanimous decision is reached, the sybils did not succeed in overthrowing the 'sybil-free'
-		social choice, as this is what the honest users wanted as well.
+		:return: A boolean array of shape ``(num_protocols, num_episodes, num_iterations)``.
+		"""
+		if self.mode is Aggregation.TRACE:
+			return self.trace
+		elif self.mode is Aggregation.PACKED:
+			return np.unpackbits(self.trace, axis=2, count=self._num_iterations).astype(bool)
+		raise ValueError('Aggregation mode \'%s\' does not keep a trace of the rounds.' % (self.mode.value,))
 
-		:return: The question's answer.
+
+class ExperimentHook:
+	"""
+	Receives progress reports from a running ``SybilResiliencyExperiment``. Subclasses override what they need.
+
+	Registering a hook makes the experiment measure the time spent per protocol and on network construction.
+	Without hooks, no time is measured at all.
+	"""
+
+	def on_start(self, experiment: 'SybilResiliencyExperiment') -> None:
 		"""
-		choices: np.ndarray = self._rng.choice(a=[0, 1], size=self.n, replace=True)
-		return choices.sum() in (0, self.n)  # everyone voted either False or True
+		Called before the first episode runs.
 
-	def sybils_win_fnp2(self) -> bool:
+		:param experiment: The experiment.
 		"""
-		Determines whether in FNP-2 the sybils won the consensus round.
+		pass
 
-		:return: The question's answer.
+	def on_episodes_done(
+			self,
+			experiment: 'SybilResiliencyExperiment',
+			episodes: np.ndarray,
+			protocol_indices: np.ndarray,
+			timings: np.ndarray) -> None:
 		"""
-		elc = Network.TwoAlternativeElection(self._num_honest, self._num_adversaries, self.n, self._rng)
-		if elc.number_votes_a >= elc.number_votes_b:
-			probability_picking_a: float = \
-				1.0 if elc.number_votes_a > elc.number_votes_b == 0 else \
-				min(1.0, (1.0 / 2.0) + Network.COST * (elc.number_votes_a - elc.number_votes_b))
-			probability_picking_b = 1 - probability_picking_a
-		else:
-			probability_picking_b: float = \
-				1.0 if elc.number_votes_b > elc.number_votes_a == 0 else \
-				min(1.0, (1.0 / 2.0) + Network.COST * (elc.number_votes_b - elc.number_votes_a))
-			probability_picking_a = 1 - probability_picking_b
-		pick: str = self._rng.choice(
-			a=Network.TwoAlternativeElection.ALTERNATIVES,
-			p=(probability_picking_a, probability_picking_b))
-		return pick == elc.sybil_choice and pick != elc.honest_majority_choice
+		Called whenever a range of episodes finished.
 
-	def sybils_win_majority(self) -> bool:
+		:param experiment: The experiment.
+		:param episodes: The indices of the finished episodes.
+		:param protocol_indices: The indices of the protocols that were run in them.
+		:param timings: The seconds spent on each of those protocols, summed over the episodes, followed by the
+			seconds spent constructing their networks.
 		"""
-		Determines whether in the majority consensus rule, the sybils won the round.
+		pass
 
-		:return: The question's answer.
+	def on_end(self, experiment: 'SybilResiliencyExperiment') -> None:
 		"""
-		elc = Network.TwoAlternativeElection(self._num_honest, self._num_adversaries, self.n, self._rng)
-		pick: str = Network.TwoAlternativeElection.ALTERNATIVES[0] if elc.number_votes_a > elc.number_votes_b else \
-			Network.TwoAlternativeElection.ALTERNATIVES[1]
-		return pick == elc.sybil_choice and pick != elc.honest_majority_choice
+		Called after the last episode finished.
 
+		:param experiment: The experiment.
+		"""
+		pass
 
-def sybils_win_consensus_round(
-		net: Network,
-		prt: ConsensusProtocol,
-		coalition_size: Optional[int] = None,
-		rng: Optional[np.random.Generator] = None) -> bool:
+
+class TimingHook(ExperimentHook):
 	"""
-	Determines whether sybils (from one adversary) win a round of consensus in the specified consensus protocol.
+	Accumulates where an experiment spends its time: per protocol, and on network construction.
 
-	``ConsensusProtocol.PROOF_OF_ACTIVITY`` and ``ConsensusProtocol.ALGORAND_PROOF`` require ``coalition_size`` to
-	be specified.
+	With several workers, the protocol and network times are summed over the processes, so they may exceed the wall
+	time. Their shares still tell which protocol dominates the budget.
+	"""
 
-	:param net: The network to simulate with.
-	:param prt: The protocol to run the consensus mechanism with.
-	:param coalition_size: Only required for coalition-dependent protocols. The coalition's number of identities.
-	:param rng: A random number generator to draw randomness from.
-	:return: The question's answer.
+	def __init__(self) -> None:
+		"""
+		Constructs a timing hook.
+		"""
+		self._protocols: Tuple[ConsensusProtocol, ...] = ()
+		self._num_iterations: int = 0
+		self._num_episodes: int = 0
+		self._start: float = 0.0
+		self._end: Optional[float] = None
+		self.episodes_done: int = 0
+		self.protocol_seconds: np.ndarray = np.zeros(shape=0)
+		self.protocol_rounds: np.ndarray = np.zeros(shape=0, dtype=np.int64)
+		self.network_seconds: float = 0.0
+
+	def on_start(self, experiment: 'SybilResiliencyExperiment') -> None:
+		self._protocols = tuple(experiment.protocols)
+		self._num_iterations = experiment.num_iterations
+		self._num_episodes = experiment.num_episodes
+		self._start, self._end = time.perf_counter(), None
+		self.episodes_done = 0
+		self.protocol_seconds = np.zeros(shape=len(self._protocols))
+		self.protocol_rounds = np.zeros(shape=len(self._protocols), dtype=np.int64)
+		self.network_seconds = 0.0
+
+	def on_episodes_done(
+			self,
+			experiment: 'SybilResiliencyExperiment',
+			episodes: np.ndarray,
+			protocol_indices: np.ndarray,
+			timings: np.ndarray) -> None:
+		self.episodes_done += len(episodes)
+		self.protocol_seconds[protocol_indices] += timings[:-1]
+		self.protocol_rounds[protocol_indices] += len(episodes) * self._num_iterations
+		self.network_seconds += timings[-1]
+
+	def on_end(self, experiment: 'SybilResiliencyExperiment') -> None:
+		self._end = time.perf_counter()
+
+	@property
+	def stats(self) -> Dict[str, object]:
+		"""
+		Summarises the timings so far. The ETA assumes that all remaining episodes run, which overestimates it for
+		adaptive experiments.
+
+		:return: A JSON-serialisable dictionary.
+		"""
+		wall: float = (self._end if self._end is not None else time.perf_counter()) - self._start
+		busy: float = float(self.protocol_seconds.sum()) + self.network_seconds
+		remaining: int = self._num_episodes - self.episodes_done
+		return {
+			'wall_seconds': wall,
+			'episodes_done': self.episodes_done,
+			'episodes_total': self._num_episodes,
+			'eta_seconds': wall / self.episodes_done * remaining if self.episodes_done > 0 else None,
+			'network_seconds': self.network_seconds,
+			'network_share': self.network_seconds / busy if busy > 0 else None,
+			'protocols': {
+				prt.value: {
+					'seconds': float(seconds),
+					'rounds': int(rounds),
+					'rounds_per_second': rounds / seconds if seconds > 0 else None,
+					'share': seconds / busy if busy > 0 else None}
+				for prt, seconds, rounds in zip(self._protocols, self.protocol_seconds, self.protocol_rounds)}}
+
+
+class JsonlHook(TimingHook):
 	"""
-	rng = rng if rng is not None else np.random.default_rng()
-	computer_power_prob: List[float] = list(np.array(net.computing_powers) / np.array(net.computing_powers).sum())
-	asset_size_prob: List[float] = list(np.array(net.asset_sizes) / np.array(net.asset_sizes).sum())
-	if coalition_size is None and type(prt) in (ConsensusProtocol.PROOF_OF_ACTIVITY, ConsensusProtocol.ALGORAND_PROOF):
-		raise ValueError('Protocol \'%s\' requires a coalition size!' % (prt.value,))
-	if prt is ConsensusProtocol.PROOF_OF_WORK:
-		return net.is_sybil(rng.choice(a=list(range(net.n)), p=computer_power_prob))
-	elif prt is ConsensusProtocol.PROOF_OF_STAKE:
-		return net.is_sybil(rng.choice(a=list(range(net.n)), p=asset_size_prob))
-	elif prt is ConsensusProtocol.PROOF_OF_ACTIVITY:
-		identities: List[int] = \
-			[ide for ide in rng.choice(a=list(range(net.n)), size=coalition_size, p=asset_size_prob)]
-		return net.sybils_belong_to_same_user(identities)
-	elif prt is ConsensusProtocol.ALGORAND_PROOF:
-		# in Algorand, we have a soft voting round and a certifying voting round
-		return \
-			sybils_win_consensus_round(net, ConsensusProtocol.PROOF_OF_ACTIVITY, coalition_size, rng) and \
-			sybils_win_consensus_round(net, ConsensusProtocol.PROOF_OF_ACTIVITY, coalition_size, rng)
-	elif prt is ConsensusProtocol.OUROBOROS:
-		# Committee members are block leaders
-		# There is one block leader per block, in this sense we have simple PoS
-		# But persistence is achieved by longest chain which depends on the committee composition
-		return \
-			sybils_win_consensus_round(net, ConsensusProtocol.PROOF_OF_STAKE, coalition_size, rng) and \
-			sybils_win_consensus_round(net, ConsensusProtocol.PROOF_OF_ACTIVITY, coalition_size, rng)
-	elif prt is ConsensusProtocol.AVALANCHE:
-		# assuming a fully connected graph the protocol approximates committee voting
-		# 	with a committee size of all nodes
-		return sybils_win_consensus_round(net, ConsensusProtocol.PROOF_OF_ACTIVITY, net.n, rng)
-	elif prt is ConsensusProtocol.CONITZER_TWO_ALT:
-		if net.network_reached_unanimous_two_alternative_decision():
-			return False
-		else:
-			return net.is_sybil(rng.choice(a=list(range(net.n))))
-	elif prt is ConsensusProtocol.CONITZER_MANY_ALT:
-		identities: Tuple[int, int] = tuple(rng.choice(a=list(range(net.n)), size=2))  # with replacement for now
-		if net.sybils_belong_to_same_user(list(identities)):
-			return True
-		elif not net.is_sybil(identities[0]) and not net.is_sybil(identities[1]):
-			return False
-		else:
-			return sybils_win_consensus_round(net, ConsensusProtocol.CONITZER_TWO_ALT, coalition_size, rng)
-	elif prt is ConsensusProtocol.FNP2:
-		return net.sybils_win_fnp2()
-	elif prt is ConsensusProtocol.MAJORITY:
-		return net.sybils_win_majority()
-	raise NotImplementedError('Consensus protocol \'%s\' is not implemented (yet).' % (prt.value,))
+	Appends the timing statistics to a JSON Lines file, one line per progress report.
+	"""
+
+	def __init__(self, path: str) -> None:
+		"""
+		Constructs a JSON Lines hook.
+
+		:param path: The file to append to.
+		"""
+		super().__init__()
+		self._path = path
+
+	def _write(self, event: str) -> None:
+		"""
+		Appends one line with the current statistics.
+
+		:param event: The kind of progress report.
+		"""
+		with open(self._path, 'a') as fp:
+			fp.write(json.dumps(dict(event=event, time=time.time(), **self.stats)) + '\n')
+
+	def on_start(self, experiment: 'SybilResiliencyExperiment') -> None:
+		super().on_start(experiment)
+		self._write('start')
+
+	def on_episodes_done(
+			self,
+			experiment: 'SybilResiliencyExperiment',
+			episodes: np.ndarray,
+			protocol_indices: np.ndarray,
+			timings: np.ndarray) -> None:
+		super().on_episodes_done(experiment, episodes, protocol_indices, timings)
+		self._write('episodes')
+
+	def on_end(self, experiment: 'SybilResiliencyExperiment') -> None:
+		super().on_end(experiment)
+		self._write('end')
 
 
 class SybilResiliencyExperiment:
@@ -290,8 +540,15 @@ class SybilResiliencyExperiment:
 	"""
 
 	LOG_FREQUENCY: int = int(1e2)  # once every hundred iterations
+	CHUNKS_PER_WORKER: int = 4  # smaller tasks balance the load better across the pool
+	ADAPTIVE_MIN_EPISODES: int = 30  # guards against stopping on a lucky, low-variance start
+	ADAPTIVE_BATCH_SIZE: int = 20  # episodes between two convergence checks
 	SAVE_DIR_NAME: str = 'results'
 	SAVE_FILE_NAME: str = 'syb_res_exp'
+	# side files with a schema of their own go into subdirectories, which analysis.r does not read as episode results
+	CI_DIR_NAME: str = 'ci'
+	PAIRED_DIR_NAME: str = 'paired'
+	MOMENTS_DIR_NAME: str = 'moments'
 
 	def __init__(
 			self,
@@ -301,10 +558,30 @@ class SybilResiliencyExperiment:
 			num_iterations: int,
 			protocols: Tuple[ConsensusProtocol, ...] = tuple(ConsensusProtocol),
 			coalition_size: Optional[int] = None,
-			rng: Optional[np.random.Generator] = None) -> None:
+			rng: Optional[np.random.Generator] = None,
+			seed: Optional[int] = None,
+			workers: Optional[int] = None,
+			cost: float = Network.COST,
+			aggregation: Aggregation = Aggregation.TRACE,
+			trace_path: Optional[str] = None,
+			exact: bool = False,
+			target_half_width: Optional[Union[float, Dict[ConsensusProtocol, float]]] = None,
+			confidence: float = 0.95,
+			hooks: Optional[List[ExperimentHook]] = None,
+			common_random_numbers: bool = False,
+			first_episode: int = 0,
+			cache: Optional[ResultCache] = None) -> None:
 		"""
 		Constructs a sybil resiliency experiment.
 
+		If a ``seed`` is given, or if ``workers`` asks for more than one process, every episode draws from its own
+		child stream of a ``np.random.SeedSequence``. The results then only depend on the seed, not on the number
+		of workers nor on the order in which the episodes finish.
+
+		If a ``target_half_width`` is given, the experiment samples adaptively: episodes are run in batches, and a
+		protocol stops being run as soon as the confidence interval of its mean win rate is narrow enough. In that
+		case, ``num_episodes`` is the maximum number of episodes per protocol.
+
 		:param num_honest: The number of honest users.
 		:param num_adversary: The number of adversaries. Each adversary has one or more sybils at their disposal.
 		:param num_episodes: The number of episodes in this experiment.
@@ -312,58 +589,354 @@ class SybilResiliencyExperiment:
 		:param protocols: The consensus protocols to involve in the experiment. At least one must be selected.
 		:param coalition_size: Only required for coalition-dependent protocols. The coalition's number of identities.
 		:param rng: A random number generator to draw randomness from.
+		:param seed: Optional. The seed to derive the per-episode random streams from.
+		:param workers: Optional. The number of processes to distribute the episodes over.
+		:param cost: Optional. The per-vote cost used by FNP-2.
+		:param aggregation: Optional. How to keep the outcomes of the rounds. Only ``Aggregation.TRACE`` and
+			``Aggregation.PACKED`` keep every round; the other modes use memory independent of ``num_iterations``.
+		:param trace_path: Optional. Only used with ``Aggregation.PACKED``. A '.npy' file to memory-map the trace to.
+		:param exact: Optional. Whether to replace sampling by the exact win probability for protocols that have a
+			closed form. The per-episode results then are expected win rates. Cannot be combined with a trace.
+		:param target_half_width: Optional. The confidence interval half-width to reach, either for all protocols or
+			per protocol. Protocols missing from a dictionary are run for all ``num_episodes``. Cannot be combined
+			with a trace.
+		:param confidence: Optional. The confidence level of the intervals.
+		:param hooks: Optional. Receivers of progress reports, e.g. a ``TimingHook``. Timing is only measured if at
+			least one hook is registered.
+		:param common_random_numbers: Optional. Whether the protocols share their randomness within each episode, so
+			that their differences can be estimated from paired episodes with less variance. Requires per-episode
+			results, so it cannot be combined with ``Aggregation.MOMENTS``.
+		:param first_episode: Optional. Only used with a ``seed``. The index of the first episode's random stream, so
+			that an experiment can continue where another one with the same seed stopped.
+		:param cache: Optional. A cache to take already computed episodes from, and to add the new ones to. Requires a
+			``seed`` and ``Aggregation.COUNTS``, and cannot be combined with adaptive sampling.
 		"""
+		if exact and aggregation in (Aggregation.TRACE, Aggregation.PACKED):
+			raise ValueError('Exact evaluation cannot keep a trace (aggregation \'%s\').' % (aggregation.value,))
+		if target_half_width is not None and aggregation in (Aggregation.TRACE, Aggregation.PACKED):
+			raise ValueError('Adaptive sampling cannot keep a trace (aggregation \'%s\').' % (aggregation.value,))
+		if cache is not None and (seed is None or aggregation is not Aggregation.COUNTS or target_half_width is not None):
+			raise ValueError('Caching requires a seed and aggregation \'counts\', without adaptive sampling.')
+		if common_random_numbers and aggregation is Aggregation.MOMENTS:
+			raise ValueError('Common random numbers need per-episode results (aggregation \'%s\').' % (aggregation.value,))
 		self._num_honest = num_honest
 		self._num_adversary = num_adversary
 		self._num_episodes = num_episodes
 		self._num_iterations = num_iterations
 		self._protocols = protocols
 		self._coalition_size = coalition_size
-		self._rng = rng if rng is not None else np.random.default_rng()
-		self.sybil_wins: np.ndarray = \
-			np.zeros(shape=(len(self._protocols), num_episodes, num_iterations), dtype=int)
+		self._cost = cost
+		self._exact = exact
+		self._common_random_numbers = common_random_numbers
+		self._rng = rng if rng is not None else np.random.default_rng(seed)
+		self._workers = workers if workers is not None else 1
+		if seed is None and self._workers > 1:
+			seed = int(self._rng.integers(np.iinfo(np.int64).max))
+		self._seed = seed
+		# the same streams as ``SeedSequence(seed).spawn(...)`` gives, starting at child ``first_episode``
+		self._first_episode = first_episode
+		self._seed_sequences: Optional[List[np.random.SeedSequence]] = [
+			np.random.SeedSequence(self._seed, spawn_key=(first_episode + epi,)) for epi in range(self._num_episodes)] \
+			if self._seed is not None else None
+		self._target_half_widths: Optional[np.ndarray] = None
+		if isinstance(target_half_width, dict):
+			self._target_half_widths = np.array([target_half_width.get(prt, -np.inf) for prt in self._protocols])
+		elif target_half_width is not None:
+			self._target_half_widths = np.full(shape=len(self._protocols), fill_value=float(target_half_width))
+		self._confidence = confidence
+		self._hooks: List[ExperimentHook] = list(hooks) if hooks is not None else []
+		self._cache = cache
+		self._num_episodes_done: int = 0
+		self.wins = WinAggregator(len(self._protocols), num_episodes, num_iterations, aggregation, trace_path)
+		# per episode, the sybils' mean share of the blocks in the Ouroboros chains (NaN where Ouroboros did not run)
+		self.chain_quality: np.ndarray = np.full(shape=num_episodes, fill_value=np.nan)
 		self._run_episodes()
 
+	@property
+	def protocols(self) -> Tuple[ConsensusProtocol, ...]:
+		"""
+		Gives the protocols involved in the experiment.
+
+		:return: The protocols.
+		"""
+		return tuple(self._protocols)
+
+	@property
+	def num_episodes(self) -> int:
+		"""
+		Gives the (maximum) number of episodes.
+
+		:return: The number of episodes.
+		"""
+		return self._num_episodes
+
+	@property
+	def num_iterations(self) -> int:
+		"""
+		Gives the number of consensus rounds per episode.
+
+		:return: The number of rounds.
+		"""
+		return self._num_iterations
+
+	@property
+	def stats(self) -> Optional[Dict[str, object]]:
+		"""
+		Gives the timing statistics of the first registered ``TimingHook``, if any.
+
+		:return: The statistics, or ``None`` if the experiment was not timed.
+		"""
+		return next((hook.stats for hook in self._hooks if isinstance(hook, TimingHook)), None)
+
+	@property
+	def sybil_chain_quality(self) -> Optional[float]:
+		"""
+		Gives the sybils' mean share of the blocks in the Ouroboros chains, over all episodes in which it ran.
+
+		:return: The chain quality, or ``None`` if the experiment does not involve Ouroboros.
+		"""
+		if np.isnan(self.chain_quality).all():
+			return None
+		return float(np.nanmean(self.chain_quality))
+
+	def paired_differences(self) -> 'pd.DataFrame':
+		"""
+		Gives, for every pair of protocols, the mean difference of their per-episode win rates and its confidence
+		interval. These are most informative with common random numbers, which make the pairs correlated.
+
+		:return: One row per pair of protocols.
+		"""
+		import pandas as pd
+		mean, half_width, num_paired = self.wins.paired_differences(self._confidence)
+		rows: List[Tuple[str, str, float, float, int]] = [
+			(self._protocols[i].value, self._protocols[j].value, mean[i, j], half_width[i, j], num_paired[i, j])
+			for i in range(len(self._protocols)) for j in range(i + 1, len(self._protocols))]
+		return pd.DataFrame(data=rows, columns=['protocol_a', 'protocol_b', 'mean_difference', 'half_width', 'episodes'])
+
+	def _cache_config(self) -> Dict[str, Any]:
+		"""
+		Gives the configuration identifying the experiment's results in a cache. The number of episodes is left out,
+		as episodes can be added to an entry.
+
+		:return: The configuration.
+		"""
+		return {
+			'num_honest': self._num_honest,
+			'num_adversary': self._num_adversary,
+			'coalition_size': self._coalition_size,
+			'protocols': [prt.value for prt in self._protocols],  # protocols share an episode's random stream
+			'cost': self._cost,
+			'seed': self._seed,
+			'first_episode': self._first_episode,
+			'num_iterations': self._num_iterations,
+			'exact': self._exact,
+			'common_random_numbers': self._common_random_numbers}
+
+	@property
+	def half_widths(self) -> np.ndarray:
+		"""
+		Gives, per protocol, the achieved half-width of the confidence interval of the mean win rate.
+
+		:return: The half-widths.
+		"""
+		return self.wins.half_width(self._confidence)
+
+	@property
+	def num_samples(self) -> np.ndarray:
+		"""
+		Gives, per protocol, the number of consensus rounds that were run (or evaluated exactly).
+
+		:return: The numbers of rounds.
+		"""
+		return self.wins.num_recorded * self._num_iterations
+
+	@property
+	def sybil_wins(self) -> np.ndarray:
+		"""
+		Gives the outcomes of all rounds. Only available if the experiment keeps a trace.
+
+		:return: A boolean array of shape ``(num_protocols, num_episodes, num_iterations)``.
+		"""
+		return self.wins.outcomes()
+
+	def _log_progress(self, num_new_episodes: int) -> None:
+		"""
+		Counts finished episodes, and prints a progress line once every ``LOG_FREQUENCY`` episodes.
+
+		:param num_new_episodes: The number of episodes that just finished.
+		"""
+		num_done: int = self._num_episodes_done + num_new_episodes
+		if num_done // SybilResiliencyExperiment.LOG_FREQUENCY > \
+				self._num_episodes_done // SybilResiliencyExperiment.LOG_FREQUENCY:
+			print('\t%d / %d' % (num_done, self._num_episodes))
+		self._num_episodes_done = num_done
+
 	def _run_episodes(self) -> None:
 		"""
 		Run the experiment's episodes.
 		"""
-		for epi in range(self._num_episodes):
-			if (epi + 1) % SybilResiliencyExperiment.LOG_FREQUENCY == 0:
-				print('\t%d / %d' % (epi + 1, self._num_episodes))
-			net = Network(self._num_honest, self._num_adversary, rng=self._rng)
-			for prt_index, prt in enumerate(self._protocols):
-				for itr in range(self._num_iterations):
-					self.sybil_wins[prt_index, epi, itr] = \
-						sybils_win_consensus_round(net, prt, self._coalition_size, self._rng)
+		executor: Optional[ProcessPoolExecutor] = \
+			ProcessPoolExecutor(max_workers=self._workers) if self._workers > 1 else None
+		for hook in self._hooks:
+			hook.on_start(self)
+		try:
+			if self._target_half_widths is None:
+				num_cached: int = self._take_cached_episodes()
+				self._run_episode_range(
+					np.arange(num_cached, self._num_episodes), np.arange(len(self._protocols)), executor)
+				if self._cache is not None and num_cached < self._num_episodes:
+					self._cache.store(self._cache_config(), self.wins.counts, self.chain_quality)
+			else:
+				self._run_episodes_adaptively(executor)
+		finally:
+			if executor is not None:
+				executor.shutdown()
+		for hook in self._hooks:
+			hook.on_end(self)
+
+	def _take_cached_episodes(self) -> int:
+		"""
+		Records the leading episodes that the cache already holds.
+
+		:return: The number of episodes taken from the cache.
+		"""
+		if self._cache is None:
+			return 0
+		cached: Optional[Tuple[np.ndarray, np.ndarray]] = self._cache.lookup(self._cache_config())
+		if cached is None:
+			return 0
+		num_cached: int = min(cached[0].shape[1], self._num_episodes)
+		if num_cached > 0:
+			self.wins.record(0, cached[0][:, :num_cached])
+			self.chain_quality[:num_cached] = cached[1][:num_cached]
+			self._log_progress(num_cached)
+		return num_cached
+
+	def _run_episodes_adaptively(self, executor: Optional[ProcessPoolExecutor]) -> None:
+		"""
+		Run batches of episodes until every protocol reached its target confidence interval, or ran out of episodes.
+
+		:param executor: Optional. The process pool to distribute the episodes over.
+		"""
+		active: np.ndarray = np.ones(shape=len(self._protocols), dtype=bool)
+		batch_size: int = max(SybilResiliencyExperiment.ADAPTIVE_BATCH_SIZE, self._workers)
+		first_episode: int = 0
+		while first_episode < self._num_episodes and active.any():
+			episodes: np.ndarray = np.arange(first_episode, min(first_episode + batch_size, self._num_episodes))
+			self._run_episode_range(episodes, np.flatnonzero(active), executor)
+			first_episode = episodes[-1] + 1
+			converged: np.ndarray = \
+				(self.wins.num_recorded >= SybilResiliencyExperiment.ADAPTIVE_MIN_EPISODES) & \
+				(self.half_widths <= self._target_half_widths)
+			active &= ~converged
+
+	def _run_episode_range(
+			self,
+			episodes: np.ndarray,
+			protocol_indices: np.ndarray,
+			executor: Optional[ProcessPoolExecutor]) -> None:
+		"""
+		Run a consecutive range of the experiment's episodes for a selection of its protocols.
+
+		:param episodes: The indices of the episodes.
+		:param protocol_indices: The indices of the protocols.
+		:param executor: Optional. The process pool to distribute the episodes over.
+		"""
+		protocols: Tuple[ConsensusProtocol, ...] = tuple(self._protocols[idx] for idx in protocol_indices)
+		timed: bool = len(self._hooks) > 0
+		if executor is None:
+			for epi in episodes:
+				rng: np.random.Generator = \
+					np.random.default_rng(self._seed_sequences[epi]) if self._seed_sequences is not None else self._rng
+				timings: Optional[np.ndarray] = np.zeros(shape=len(protocols) + 1) if timed else None
+				counts, packed, self.chain_quality[epi] = _simulate_episode(
+					self._num_honest, self._num_adversary, self._num_iterations, protocols, self._coalition_size,
+					self._cost, self._exact, self.wins.keeps_trace, rng, timings, self._common_random_numbers)
+				self.wins.record(
+					epi, counts[:, None], packed[:, None, :] if packed is not None else None, protocol_indices)
+				self._log_progress(1)
+				for hook in self._hooks:
+					hook.on_episodes_done(self, np.array([epi]), protocol_indices, timings)
+			return
+		chunks: List[np.ndarray] = [
+			chunk for chunk in np.array_split(episodes, self._workers * SybilResiliencyExperiment.CHUNKS_PER_WORKER)
+			if chunk.size > 0]
+		futures = {
+			executor.submit(
+				_simulate_episodes,
+				self._num_honest, self._num_adversary, self._num_iterations, protocols, self._coalition_size,
+				self._cost, self._exact, [self._seed_sequences[epi] for epi in chunk], self.wins.keeps_trace,
+				timed, self._common_random_numbers): chunk
+			for chunk in chunks}
+		for future in as_completed(futures):
+			chunk: np.ndarray = futures[future]
+			counts, packed, timings, self.chain_quality[chunk] = future.result()
+			self.wins.record(chunk[0], counts, packed, protocol_indices)
+			self._log_progress(chunk.size)
+			for hook in self._hooks:
+				hook.on_episodes_done(self, chunk, protocol_indices, timings)
+
+	def results_path(self, dir_name: str = SAVE_DIR_NAME, file_name: str = SAVE_FILE_NAME) -> str:
+		"""
+		Gives the path ``save`` writes the main results to.
+
+		:param dir_name: The name of the directory to save the results into.
+		:param file_name: The name of the file to save the results to. Exclude the '.csv' extension.
+		:return: The path.
+		"""
+		if self.wins.mode is Aggregation.MOMENTS:
+			return dir_name + '/' + SybilResiliencyExperiment.MOMENTS_DIR_NAME + '/' + file_name + '.csv'
+		return dir_name + '/' + file_name + '.csv'
 
 	def save(self, dir_name: str = SAVE_DIR_NAME, file_name: str = SAVE_FILE_NAME) -> None:
 		"""
 		Saves the experiment results to the current directory.
 
+		One row is written per episode, holding the sybils' win rate per protocol. In ``Aggregation.MOMENTS`` mode,
+		only the mean and variance over the episodes are written instead, to a file of the same name in the
+		``MOMENTS_DIR_NAME`` subdirectory. Adaptive experiments additionally write
+		the achieved confidence intervals and sample counts to a file of the same name in the ``CI_DIR_NAME``
+		subdirectory. Experiments with common random numbers additionally write the paired differences between
+		protocols to a file of the same name in the ``PAIRED_DIR_NAME`` subdirectory.
+
+		The file is first written under a temporary name and then moved into place, so an interrupted save never
+		leaves a truncated CSV behind.
+
 		:param dir_name: The name of the directory to save the results into.
 		:param file_name: The name of the file to save the results to. Exclude the '.csv' extension.
 		"""
+		import pandas as pd
 		try:
 			os.mkdir(dir_name)
 		except FileExistsError:
 			pass  # that's okay
-		averages: np.ndarray = self.sybil_wins.mean(axis=2)  # average over iterations
-		df: pd.DataFrame = pd.DataFrame(data=averages.T, columns=[prt.value for prt in self._protocols])
-		df.to_csv(path_or_buf=dir_name + '/' + file_name + '.csv', index=False)
+		columns: List[str] = [prt.value for prt in self._protocols]
+		path: str = self.results_path(dir_name, file_name)
+		if self.wins.mode is Aggregation.MOMENTS:
+			os.makedirs(dir_name + '/' + SybilResiliencyExperiment.MOMENTS_DIR_NAME, exist_ok=True)
+			df: pd.DataFrame = pd.DataFrame(
+				data=[self.wins.mean(), self.wins.variance()], columns=columns, index=['mean', 'variance'])
+			df.to_csv(path_or_buf=path + '.tmp', index_label='statistic')
+		else:
+			averages: np.ndarray = self.wins.episode_win_rates()  # average over iterations
+			df: pd.DataFrame = pd.DataFrame(data=averages.T, columns=columns)
+			df.to_csv(path_or_buf=path + '.tmp', index=False)
+		os.replace(path + '.tmp', path)
+		if self._target_half_widths is not None:
+			os.makedirs(dir_name + '/' + SybilResiliencyExperiment.CI_DIR_NAME, exist_ok=True)
+			ci_path: str = dir_name + '/' + SybilResiliencyExperiment.CI_DIR_NAME + '/' + file_name + '.csv'
+			df_ci: pd.DataFrame = pd.DataFrame(
+				data=[self.wins.mean(), self.half_widths, self.wins.num_recorded, self.num_samples],
+				columns=columns, index=['mean', 'half_width', 'episodes', 'rounds'])
+			df_ci.to_csv(path_or_buf=ci_path + '.tmp', index_label='statistic')
+			os.replace(ci_path + '.tmp', ci_path)
+		if self._common_random_numbers:
+			os.makedirs(dir_name + '/' + SybilResiliencyExperiment.PAIRED_DIR_NAME, exist_ok=True)
+			paired_path: str = dir_name + '/' + SybilResiliencyExperiment.PAIRED_DIR_NAME + '/' + file_name + '.csv'
+			self.paired_differences().to_csv(path_or_buf=paired_path + '.tmp', index=False)
+			os.replace(paired_path + '.tmp', paired_path)
 
 
 if __name__ == '__main__':
-	num_eps: int = int(1e3)
-	num_its: int = int(5e1)
-	all_protocols: Tuple[ConsensusProtocol, ...] = tuple(ConsensusProtocol)  # include 'em all
-	col_siz: int = int(5e0)
-	t_start: float = time.time()
-	for n_honest in (100,):
-		for n_adversary in (1,):
-			print('EXPERIMENT (honest: %d, adversary: %d).' % (n_honest, n_adversary))
-			t_start_exp: float = time.time()
-			sre = SybilResiliencyExperiment(n_honest, n_adversary, num_eps, num_its, all_protocols, col_siz)
-			sre.save('results', 'exp-%d-hon-%d-adv' % (n_honest, n_adversary))
-			print('\tDone. Took %.1lf sec.' % (time.time() - t_start_exp))
-	print('ALL EXPERIMENTS DONE. TOOK %.0lf min' % ((time.time() - t_start) / 60.0,))
+	import sweep  # imported lazily, as the sweep module itself builds upon this one
+	sweep.main()
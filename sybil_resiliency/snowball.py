@@ -0,0 +1,231 @@
+import numpy as np
+from enum import Enum
+from math import comb
+from typing import Tuple
+
+from network import Network
+
+
+class AdversaryStrategy(Enum):
+	"""
+	Stores symbols for the ways in which sybils answer the queries of honest nodes in Snowball.
+	"""
+	BALANCE = 'balance'  # answer with the colour fewer honest nodes prefer, to keep the network split
+	OPPOSE = 'oppose'  # answer with the opposite of the querying node's preference
+	CONSTANT = 'constant'  # always answer with the adversary's own colour, drawn per adversary and instance
+	SILENT = 'silent'  # never answer, starving the queries of their quorum
+
+
+class SnowballConsensus:
+	"""
+	A batch of independent binary Snowball consensus instances, the consensus core of Avalanche, on one network.
+
+	In every query round, each honest node that has not decided yet samples ``sample_size`` peers, weighted by asset
+	size and with replacement, and collects their colours. Honest peers answer with their current preference; sybils
+	answer as the ``AdversaryStrategy`` tells, each adversary as a party of its own. As the peers are drawn
+	independently, a query only depends on the stake answering each colour, so its outcome is drawn from the exact
+	binomial probabilities of reaching a quorum instead of drawing every peer. If at least ``alpha * sample_size`` answers agree on a colour, the
+	node's confidence in that colour grows, and its preference moves to the colour with the most confidence. A node
+	decides on its preference after ``beta`` consecutive successful queries for the same colour.
+
+	The honest nodes start with uniformly random preferences. The sybils win an instance unless all honest nodes
+	decide on one and the same colour within ``max_rounds`` query rounds.
+
+	The nodes of many instances are updated together, one query round at a time, and instances leave the batch as soon
+	as they settled. Instances are run in chunks of at most ``nodes_per_chunk`` honest nodes in total, so that memory
+	stays bounded however many instances are asked for.
+	"""
+
+	SAMPLE_SIZE: int = 20  # k
+	ALPHA: float = 0.8  # quorum, as a fraction of k
+	BETA: int = 15  # consecutive successes needed to decide
+	MAX_ROUNDS: int = 200  # after which an undecided instance counts as a liveness failure
+	NODES_PER_CHUNK: int = 2 ** 20  # honest nodes, over all instances, whose state is kept at once
+
+	def __init__(
+			self,
+			net: Network,
+			num_instances: int,
+			rng: np.random.Generator,
+			strategy: AdversaryStrategy = AdversaryStrategy.BALANCE,
+			sample_size: int = SAMPLE_SIZE,
+			alpha: float = ALPHA,
+			beta: int = BETA,
+			max_rounds: int = MAX_ROUNDS,
+			nodes_per_chunk: int = NODES_PER_CHUNK) -> None:
+		"""
+		Sets up a batch of Snowball instances.
+
+		:param net: The network to run the instances on.
+		:param num_instances: The number of independent instances.
+		:param rng: A random number generator to draw randomness from.
+		:param strategy: Optional. How the sybils answer queries.
+		:param sample_size: Optional. The number of peers every query samples.
+		:param alpha: Optional. The quorum, as a fraction of ``sample_size``. Must exceed one half.
+		:param beta: Optional. The number of consecutive successful queries after which a node decides.
+		:param max_rounds: Optional. The number of query rounds after which the instances are stopped.
+		:param nodes_per_chunk: Optional. The number of honest nodes, over all instances, to run together.
+		"""
+		if not 0.5 < alpha <= 1.0:
+			raise ValueError('Snowball requires a quorum fraction in (0.5, 1] (got %s).' % (alpha,))
+		self._net = net
+		self._rng = rng
+		self._strategy = strategy
+		self._sample_size = sample_size
+		self._quorum: int = int(np.ceil(alpha * sample_size))
+		self._beta = beta
+		self._max_rounds = max_rounds
+		self._num_instances = num_instances
+		self._num_honest: int = net.num_honest  # honest nodes are identities 0 up to num_honest
+		self._honest_shares: np.ndarray = net.asset_sizes[:self._num_honest] / net.asset_sizes.sum()
+		self._honest_share: float = float(self._honest_shares.sum())
+		self._adversary_shares: np.ndarray = net.adversary_shares(net.asset_sizes)
+		self._sybil_share: float = float(self._adversary_shares.sum())
+		self._quorum_counts: np.ndarray = np.arange(self._quorum, sample_size + 1)  # answers for a colour reaching quorum
+		self._quorum_coefficients: np.ndarray = np.array(
+			[comb(sample_size, count) for count in self._quorum_counts], dtype=np.float64)
+		self._instances_per_chunk: int = max(1, nodes_per_chunk // max(self._num_honest, 1))
+		self._start(min(num_instances, self._instances_per_chunk))
+
+	def _start(self, num_instances: int) -> None:
+		"""
+		Sets up the state of a fresh chunk of instances. The state holds one row per instance that did not settle yet.
+
+		:param num_instances: The number of instances in the chunk.
+		"""
+		shape = (num_instances, self._num_honest)
+		self.instances: np.ndarray = np.arange(num_instances)  # per row, its instance within the chunk
+		self.preferences: np.ndarray = self._rng.integers(0, 2, size=shape, dtype=np.int8)
+		self.confidences_one: np.ndarray = np.zeros(shape=shape, dtype=np.int32)
+		self.confidences_zero: np.ndarray = np.zeros(shape=shape, dtype=np.int32)
+		self.last_colours: np.ndarray = self.preferences.astype(bool)  # the colour of each node's last success
+		self.consecutive_successes: np.ndarray = np.zeros(shape=shape, dtype=np.int32)
+		self.decided: np.ndarray = np.zeros(shape=shape, dtype=bool)
+		if self._strategy is AdversaryStrategy.CONSTANT:
+			self.adversary_colours: np.ndarray = self._rng.integers(
+				0, 2, size=(num_instances, self._adversary_shares.size), dtype=np.int8)
+		self.num_rounds: int = 0
+
+	def _sybil_answer_shares(self) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Gives the shares of the total asset size held by sybils that answer with colour one, and by sybils that answer
+		with colour zero. Every adversary is a party of its own that answers with its own stake.
+
+		:return: The stake answering one and the stake answering zero, as shares. Both broadcast to one row per
+			instance and one column per preference of the querying node.
+		"""
+		if self._strategy is AdversaryStrategy.OPPOSE:
+			return np.array([[self._sybil_share, 0.0]]), np.array([[0.0, self._sybil_share]])
+		elif self._strategy is AdversaryStrategy.BALANCE:
+			num_preferring_one: np.ndarray = self.preferences.sum(axis=1, dtype=np.int64)
+			answers_one: np.ndarray = (2 * num_preferring_one < self._num_honest)[:, None] * self._sybil_share
+		elif self._strategy is AdversaryStrategy.CONSTANT:
+			answers_one = (self.adversary_colours @ self._adversary_shares)[:, None]
+		else:
+			return np.zeros(shape=(1, 1)), np.zeros(shape=(1, 1))
+		return answers_one, self._sybil_share - answers_one
+
+	def _quorum_probabilities(self, shares: np.ndarray) -> np.ndarray:
+		"""
+		Gives the probability that at least a quorum of the sampled peers answers with a colour.
+
+		:param shares: The shares of the total asset size answering with the colour.
+		:return: The probabilities, of the same shape as ``shares``.
+		"""
+		shares = np.clip(shares, 0.0, 1.0)[..., None]
+		return (self._quorum_coefficients * shares ** self._quorum_counts
+				* (1.0 - shares) ** (self._sample_size - self._quorum_counts)).sum(axis=-1)
+
+	def step(self) -> None:
+		"""
+		Runs one query round for every honest node that has not decided yet. All queries see the preferences from
+		before the round.
+
+		As the quorum exceeds half the sample, a query reaches a quorum for at most one colour. The probability of
+		either only depends on the instance and the preference of the querying node, so one uniform decides each query.
+		"""
+		preferring_one: np.ndarray = self.preferences.view(bool)  # colours are zeros and ones
+		honest_one: np.ndarray = (preferring_one @ self._honest_shares)[:, None]  # honest stake preferring one
+		sybil_one, sybil_zero = self._sybil_answer_shares()
+		quorum_one: np.ndarray = self._quorum_probabilities(honest_one + sybil_one)
+		quorum_zero: np.ndarray = self._quorum_probabilities(self._honest_share - honest_one + sybil_zero)
+		if quorum_one.shape[1] == 2:  # the sybils' answers depend on the querying node's preference
+			quorum_one = np.where(preferring_one, quorum_one[:, 1:], quorum_one[:, :1])
+			quorum_zero = np.where(preferring_one, quorum_zero[:, 1:], quorum_zero[:, :1])
+
+		active: np.ndarray = ~self.decided
+		uniforms: np.ndarray = self._rng.random(self.preferences.shape)
+		success_one: np.ndarray = active & (uniforms < quorum_one)
+		success_zero: np.ndarray = active & (1.0 - uniforms <= quorum_zero)
+		success: np.ndarray = success_one | success_zero
+
+		self.confidences_one += success_one
+		self.confidences_zero += success_zero
+		preferring_one = (preferring_one | (success_one & (self.confidences_one > self.confidences_zero))) \
+			& ~(success_zero & (self.confidences_zero > self.confidences_one))
+		self.preferences = preferring_one.view(np.int8)
+		# decided nodes never succeed, so their streak drops to zero, but they stay decided
+		self.consecutive_successes *= success_one == self.last_colours
+		self.consecutive_successes += 1
+		self.consecutive_successes *= success
+		self.last_colours = success_one | (self.last_colours & ~success)
+		self.decided |= self.consecutive_successes >= self._beta
+		self.num_rounds += 1
+
+	def _settled(self) -> np.ndarray:
+		"""
+		Determines which instances cannot change outcome anymore: those in which every honest node decided, and those
+		in which honest nodes already decided on different colours.
+
+		:return: A boolean array with one entry per row of the state.
+		"""
+		decided_one: np.ndarray = (self.decided & (self.preferences == 1)).any(axis=1)
+		decided_zero: np.ndarray = (self.decided & (self.preferences == 0)).any(axis=1)
+		return self.decided.all(axis=1) | (decided_one & decided_zero)
+
+	def _drop(self, rows: np.ndarray) -> None:
+		"""
+		Removes instances from the state.
+
+		:param rows: A boolean array with one entry per row of the state, stating whether to remove the row.
+		"""
+		keep: np.ndarray = ~rows
+		for attribute in ('instances', 'preferences', 'confidences_one', 'confidences_zero', 'last_colours',
+						  'consecutive_successes', 'decided', 'adversary_colours'):
+			if hasattr(self, attribute):
+				setattr(self, attribute, getattr(self, attribute)[keep])
+
+	def _run_chunk(self) -> np.ndarray:
+		"""
+		Runs query rounds on the current chunk until every instance in it settled, or ``max_rounds`` rounds passed.
+
+		:return: A boolean array with one entry per instance of the chunk, stating whether the sybils won it.
+		"""
+		sybils_win: np.ndarray = np.ones(shape=self.instances.size, dtype=bool)  # instances left over are not live
+		while True:
+			settled: np.ndarray = self._settled()
+			if settled.any():
+				preferences: np.ndarray = self.preferences[settled]
+				agreed: np.ndarray = self.decided[settled].all(axis=1) & (preferences == preferences[:, :1]).all(axis=1)
+				sybils_win[self.instances[settled]] = ~agreed
+				self._drop(settled)
+			if self.instances.size == 0 or self.num_rounds >= self._max_rounds:
+				return sybils_win
+			self.step()
+
+	def run(self) -> np.ndarray:
+		"""
+		Runs every instance, chunk by chunk, until it settled or ``max_rounds`` rounds passed. Afterwards, the state
+		attributes describe the instances of the last chunk that did not settle.
+
+		:return: A boolean array with one entry per instance, stating whether the sybils won it.
+		"""
+		if self._num_honest == 0:
+			return np.ones(shape=self._num_instances, dtype=bool)
+		sybils_win: np.ndarray = np.empty(shape=self._num_instances, dtype=bool)
+		for start in range(0, self._num_instances, self._instances_per_chunk):
+			stop: int = min(start + self._instances_per_chunk, self._num_instances)
+			if start > 0:
+				self._start(stop - start)  # the first chunk was set up on construction
+			sybils_win[start:stop] = self._run_chunk()
+		return sybils_win
@@ -0,0 +1,268 @@
+import argparse
+import hashlib
+import itertools
+import json
+import numpy as np
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from cache import ResultCache
+from resiliencies import Aggregation, ConsensusProtocol, Network, SybilResiliencyExperiment
+
+
+class SweepCell(NamedTuple):
+	"""
+	A single configuration of a parameter sweep.
+	"""
+	num_honest: int
+	num_adversary: int
+	coalition_size: Optional[int]
+	protocols: Tuple[ConsensusProtocol, ...]
+	cost: float
+
+	@property
+	def name(self) -> str:
+		"""
+		Gives the name identifying the cell. It doubles as the name of the cell's results file.
+
+		:return: The name.
+		"""
+		return 'exp-%d-hon-%d-adv-%s-col-%s-cost-%s-prt' % (
+			self.num_honest, self.num_adversary,
+			'none' if self.coalition_size is None else str(self.coalition_size),
+			repr(self.cost), '+'.join(prt.value for prt in self.protocols))
+
+	def estimated_work(self) -> float:
+		"""
+		Gives a rough, relative estimate of the amount of work needed to compute the cell.
+
+		:return: The estimate.
+		"""
+		mean_sybils: float = float(np.mean(Network.SYBILS_PER_ADVERSARY_MIN_MAX))
+		n: float = self.num_honest + self.num_adversary * mean_sybils
+		coalition: int = self.coalition_size if self.coalition_size is not None else 1
+		return sum(n if prt is ConsensusProtocol.AVALANCHE else n + coalition for prt in self.protocols)
+
+
+def _run_cell(
+		cell: SweepCell,
+		num_episodes: int,
+		num_iterations: int,
+		seed: Optional[int],
+		dir_name: str,
+		cache_dir: Optional[str] = None) -> float:
+	"""
+	Computes a single cell of a sweep and saves its results. Used as a process pool task.
+
+	:param cell: The cell to compute.
+	:param num_episodes: The number of episodes per experiment.
+	:param num_iterations: The number of consensus rounds per episode.
+	:param seed: Optional. The seed of the cell's experiment.
+	:param dir_name: The name of the directory to save the results into.
+	:param cache_dir: Optional. Only used with a seed. The directory of a result cache to reuse episodes from.
+	:return: The number of seconds it took to compute the cell.
+	"""
+	t_start: float = time.time()
+	cache: Optional[ResultCache] = ResultCache(cache_dir) if cache_dir is not None and seed is not None else None
+	sre = SybilResiliencyExperiment(
+		cell.num_honest, cell.num_adversary, num_episodes, num_iterations, cell.protocols, cell.coalition_size,
+		seed=seed, cost=cell.cost, aggregation=Aggregation.COUNTS, cache=cache)
+	sre.save(dir_name, cell.name)
+	return time.time() - t_start
+
+
+class ParameterSweep:
+	"""
+	Runs a sybil resiliency experiment for every cell of a parameter grid.
+
+	Cells are scheduled largest-first over a pool of worker processes. Every finished cell is saved atomically and
+	recorded in a manifest, together with the settings it was computed with, so a sweep that is interrupted can be
+	restarted and only computes the missing cells, and those computed with other settings.
+	"""
+
+	MANIFEST_FILE_NAME: str = 'manifest.json'
+
+	def __init__(
+			self,
+			cells: Iterable[SweepCell],
+			num_episodes: int,
+			num_iterations: int,
+			dir_name: str = SybilResiliencyExperiment.SAVE_DIR_NAME,
+			seed: Optional[int] = None,
+			workers: Optional[int] = None,
+			cache_dir: Optional[str] = None) -> None:
+		"""
+		Constructs a parameter sweep.
+
+		:param cells: The cells to compute. See ``ParameterSweep.grid`` to obtain them from a grid.
+		:param num_episodes: The number of episodes per experiment.
+		:param num_iterations: The number of consensus rounds per episode.
+		:param dir_name: The name of the directory to save the results and the manifest into.
+		:param seed: Optional. The seed from which each cell's seed is derived.
+		:param workers: Optional. The number of processes to distribute the cells over.
+		:param cache_dir: Optional. Only used with a seed. The directory of a ``ResultCache`` shared by all cells, so
+			that cells computed by earlier sweeps (possibly with fewer episodes) are reused.
+		"""
+		self._cells: List[SweepCell] = sorted(cells, key=lambda cel: cel.estimated_work(), reverse=True)
+		self._num_episodes = num_episodes
+		self._num_iterations = num_iterations
+		self._dir_name = dir_name
+		self._seed = seed
+		self._workers = workers if workers is not None else 1
+		self._cache_dir = cache_dir
+
+	@staticmethod
+	def grid(
+			num_honest: Sequence[int],
+			num_adversary: Sequence[int],
+			coalition_size: Sequence[Optional[int]],
+			protocols: Sequence[Tuple[ConsensusProtocol, ...]],
+			cost: Sequence[float] = (Network.COST,)) -> List[SweepCell]:
+		"""
+		Gives the cells of the Cartesian product of the supplied parameter values.
+
+		:param num_honest: The numbers of honest users.
+		:param num_adversary: The numbers of adversaries.
+		:param coalition_size: The coalition sizes.
+		:param protocols: The protocol selections. Each entry is a tuple of protocols run together in one experiment.
+		:param cost: The per-vote costs used by FNP-2.
+		:return: The cells.
+		"""
+		return [SweepCell(*values) for values in itertools.product(
+			num_honest, num_adversary, coalition_size, protocols, cost)]
+
+	def _manifest_path(self) -> str:
+		"""
+		Gives the path of the sweep's manifest.
+
+		:return: The path.
+		"""
+		return self._dir_name + '/' + ParameterSweep.MANIFEST_FILE_NAME
+
+	def _results_path(self, cell: SweepCell) -> str:
+		"""
+		Gives the path of the results file of a cell.
+
+		:param cell: The cell.
+		:return: The path.
+		"""
+		return self._dir_name + '/' + cell.name + '.csv'
+
+	def _load_manifest(self) -> Dict[str, Any]:
+		"""
+		Loads the manifest of the sweep's directory.
+
+		:return: The manifest. Empty if none has been written yet.
+		"""
+		try:
+			with open(self._manifest_path(), 'r') as fp:
+				return json.load(fp)
+		except FileNotFoundError:
+			return {'cells': {}}
+
+	def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+		"""
+		Atomically replaces the manifest of the sweep's directory.
+
+		:param manifest: The manifest to save.
+		"""
+		fd, tmp_path = tempfile.mkstemp(dir=self._dir_name, suffix='.tmp')
+		with os.fdopen(fd, 'w') as fp:
+			json.dump(manifest, fp, indent='\t')
+		os.replace(tmp_path, self._manifest_path())
+
+	def _cell_seed(self, cell: SweepCell) -> Optional[int]:
+		"""
+		Derives the seed of a cell from the sweep's seed, such that it does not depend on the cell's position.
+
+		:param cell: The cell.
+		:return: The seed, or ``None`` if the sweep is unseeded.
+		"""
+		if self._seed is None:
+			return None
+		digest: bytes = hashlib.sha256(('%d:%s' % (self._seed, cell.name)).encode()).digest()
+		return int.from_bytes(digest[:8], 'little')
+
+	def _is_done(self, cell: SweepCell, entry: Optional[Dict[str, Any]]) -> bool:
+		"""
+		Determines whether a cell's results were computed with the sweep's current settings.
+
+		:param cell: The cell.
+		:param entry: The cell's entry in the manifest, or ``None`` if it has none.
+		:return: The question's answer. Results with other episode or iteration counts, or another seed, are stale.
+		"""
+		return \
+			entry is not None and os.path.exists(self._results_path(cell)) and \
+			entry.get('num_episodes') == self._num_episodes and \
+			entry.get('num_iterations') == self._num_iterations and \
+			entry.get('seed') == self._cell_seed(cell)
+
+	def pending_cells(self) -> List[SweepCell]:
+		"""
+		Gives the cells that still have to be computed, largest first. Cells whose results were computed with other
+		settings are computed anew.
+
+		:return: The cells.
+		"""
+		done: Dict[str, Any] = self._load_manifest()['cells']
+		return [cell for cell in self._cells if not self._is_done(cell, done.get(cell.name))]
+
+	def run(self) -> None:
+		"""
+		Computes all pending cells of the sweep.
+		"""
+		os.makedirs(self._dir_name, exist_ok=True)
+		manifest: Dict[str, Any] = self._load_manifest()
+		pending: List[SweepCell] = self.pending_cells()
+		print('SWEEP: %d of %d cells pending.' % (len(pending), len(self._cells)))
+		with ProcessPoolExecutor(max_workers=self._workers) as executor:
+			futures = {
+				executor.submit(
+					_run_cell, cell, self._num_episodes, self._num_iterations, self._cell_seed(cell),
+					self._dir_name, self._cache_dir): cell
+				for cell in pending}
+			for future in as_completed(futures):
+				cell: SweepCell = futures[future]
+				seconds: float = future.result()
+				manifest['cells'][cell.name] = {
+					'file': cell.name + '.csv',
+					'num_honest': cell.num_honest,
+					'num_adversary': cell.num_adversary,
+					'coalition_size': cell.coalition_size,
+					'protocols': [prt.value for prt in cell.protocols],
+					'cost': cell.cost,
+					'num_episodes': self._num_episodes,
+					'num_iterations': self._num_iterations,
+					'seed': self._cell_seed(cell),
+					'seconds': seconds}
+				self._save_manifest(manifest)
+				print('\tDone with %s. Took %.1lf sec.' % (cell.name, seconds))
+
+
+def main(seed: Optional[int] = 0, cache_dir: Optional[str] = ResultCache.DEFAULT_DIR_NAME) -> None:
+	"""
+	Runs the default sweep.
+
+	:param seed: Optional. The seed from which each cell's seed is derived. ``None`` runs an unseeded sweep.
+	:param cache_dir: Optional. Only used with a seed. The directory of the result cache. ``None`` disables the cache.
+	"""
+	num_eps: int = int(1e3)
+	num_its: int = int(5e1)
+	all_protocols: Tuple[ConsensusProtocol, ...] = tuple(ConsensusProtocol)  # include 'em all
+	t_start: float = time.time()
+	cells: List[SweepCell] = ParameterSweep.grid(
+		num_honest=(100,), num_adversary=(1,), coalition_size=(int(5e0),), protocols=(all_protocols,))
+	ParameterSweep(cells, num_eps, num_its, seed=seed, cache_dir=cache_dir).run()
+	print('ALL EXPERIMENTS DONE. TOOK %.0lf min' % ((time.time() - t_start) / 60.0,))
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Run the default parameter sweep.')
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--cache-dir', default=ResultCache.DEFAULT_DIR_NAME, help='directory of the result cache')
+	parser.add_argument('--no-cache', action='store_true', help='do not reuse or store cached episodes')
+	args = parser.parse_args()
+	main(seed=args.seed, cache_dir=None if args.no_cache else args.cache_dir)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the project's modules use flat imports, so make each source directory importable
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in (root, os.path.join(root, 'sybil_resiliency'), os.path.join(root, 'src')):
+    sys.path.insert(0, directory)
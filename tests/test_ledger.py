@@ -0,0 +1,52 @@
+import numpy as np
+
+from block import Block
+from blockchain import Blockchain
+from storage import load_run, save_run
+
+# The per-agent ledger index against a brute-force scan, and runs saved to and loaded from disk.
+
+num_agents: int = 30
+
+def random_chain(rng, num_blocks, queries=None):
+    blockchain = Blockchain(rng.uniform(50, 150, size=num_agents))
+    for _ in range(num_blocks):
+        size = int(rng.integers(0, 40))
+        sources = rng.integers(0, num_agents, size=size)
+        destinations = (sources + rng.integers(1, num_agents, size=size)) % num_agents   # no transfers to oneself
+        block = Block()
+        block.add_transactions(sources, destinations, rng.uniform(1, 10, size=size))
+        blockchain.add_block(block)
+        if queries is not None:
+            queries(blockchain)
+    return blockchain
+
+def check_index(blockchain):
+    ledger = blockchain.ledger
+    for agent in range(num_agents):
+        outgoing, incoming = ledger.sources == agent, ledger.destinations == agent
+        assert np.array_equal(blockchain.get_agent_transactions(agent), np.flatnonzero(outgoing | incoming))
+        assert np.array_equal(blockchain.get_agent_transactions(agent, True), np.flatnonzero(outgoing))
+        assert np.array_equal(blockchain.get_agent_transactions(agent, False), np.flatnonzero(incoming))
+        changes = np.cumsum(np.concatenate(([0.0], np.where(incoming, ledger.amounts, 0.0) - np.where(outgoing, ledger.amounts, 0.0))))
+        for offset in range(0, ledger.get_num_transactions() + 1, 7):
+            assert np.isclose(blockchain.index.balance_change_before(agent, offset), changes[offset])
+
+def test_index_matches_a_scan_while_the_chain_grows():
+    check_index(random_chain(np.random.default_rng(0), 25, queries=check_index))
+
+def test_saved_run_loads_equal(tmp_path):
+    blockchain = random_chain(np.random.default_rng(1), 12)
+    balances, is_sybil = np.random.default_rng(2).uniform(0, 200, size=num_agents), np.arange(num_agents) >= 25
+    par, agent_par = {'num_epochs': 12, 'num_agents': num_agents}, {'donate_prob': 0.01}
+    save_run(str(tmp_path), blockchain, balances, is_sybil, par, agent_par)
+    run = load_run(str(tmp_path))
+    loaded = run['blockchain']
+    for column in ('sources', 'destinations', 'amounts', 'block_offsets'):
+        assert np.array_equal(getattr(loaded.ledger, column), getattr(blockchain.ledger, column))
+    assert np.array_equal(run['balances'], balances) and np.array_equal(run['is_sybil'], is_sybil)
+    assert run['par'] == par and run['agent_par'] == agent_par
+    assert np.isclose(loaded.volume, blockchain.volume)
+    assert [block.transactions for block in loaded.blocks] == [block.transactions for block in blockchain.blocks]
+    for agent in range(num_agents):
+        assert np.isclose(loaded.get_balance_at(agent, 5), blockchain.get_balance_at(agent, 5))
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from network import ConsensusProtocol, Network
+from resiliencies import sybils_win_consensus_rounds, sybils_win_probability
+
+# Weighted identity draws and exact win probabilities against sampled frequencies.
+# Sampled checks allow five standard errors, so they fail by chance about once in a few million runs.
+
+num_draws: int = 400000
+
+def within_five_standard_errors(frequencies, probabilities, num_samples):
+    return np.all(np.abs(frequencies - probabilities) <= 5 * np.sqrt(probabilities * (1 - probabilities) / num_samples) + 1e-12)
+
+def test_alias_table_is_exact():
+    weights = np.random.default_rng(0).pareto(1.5, size=1000)
+    weights[::7] = 0.0
+    acceptance, alias = Network._build_alias_table(weights)
+    # every column hands its acceptance to itself and the rest to its alias
+    probabilities = (acceptance + np.bincount(alias, weights=1 - acceptance, minlength=weights.size)) / weights.size
+    assert np.allclose(probabilities, weights / weights.sum(), rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize('attribute', ('computing_powers', 'asset_sizes'))
+def test_alias_and_cdf_draws_follow_the_weights(attribute):
+    net = Network(50, 3, rng=np.random.default_rng(0))
+    weights = np.asarray(getattr(net, attribute), dtype=float)
+    probabilities = weights / weights.sum()
+    if attribute == 'computing_powers':
+        alias_draws = net.draw_by_computing_power(num_draws, np.random.default_rng(1))
+        cdf_draws = net.identities_by_computing_power(np.random.default_rng(2).random(num_draws))
+    else:
+        alias_draws = net.draw_by_asset_size(num_draws, np.random.default_rng(1))
+        cdf_draws = net.identities_by_asset_size(np.random.default_rng(2).random(num_draws))
+    for draws in (alias_draws, cdf_draws):
+        assert within_five_standard_errors(np.bincount(draws, minlength=net.n) / num_draws, probabilities, num_draws)
+
+@pytest.mark.parametrize('prt', list(ConsensusProtocol))
+def test_exact_probability_matches_sampled_rate(prt):
+    net = Network(20, 1, rng=np.random.default_rng(3))
+    probability = sybils_win_probability(net, prt, 2)
+    if probability is None:
+        pytest.skip('%s has no closed form' % (prt.value,))
+    wins = sybils_win_consensus_rounds(net, prt, num_draws, 2, np.random.default_rng(4))
+    assert within_five_standard_errors(wins.mean(), probability, num_draws)
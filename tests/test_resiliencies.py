@@ -0,0 +1,50 @@
+import numpy as np
+
+from cache import ResultCache
+from network import ConsensusProtocol
+from resiliencies import Aggregation, SybilResiliencyExperiment, WinAggregator
+
+# The running moments of the win aggregator and the result cache of seeded experiments.
+
+protocols: tuple = (ConsensusProtocol.PROOF_OF_STAKE, ConsensusProtocol.PROOF_OF_ACTIVITY, ConsensusProtocol.CONITZER_TWO_ALT)
+
+def test_merged_moments_match_numpy():
+    num_iterations = 25
+    counts = np.random.default_rng(0).integers(0, num_iterations + 1, size=(3, 40)).astype(float)
+    wins = WinAggregator(3, 40, num_iterations, mode=Aggregation.MOMENTS)
+    start = 0
+    for size in (1, 7, 2, 13, 17):                  # uneven batches, merged with Chan et al.'s update
+        wins.record(start, counts[:, start:start + size])
+        start += size
+    rates = counts / num_iterations
+    assert np.allclose(wins.mean(), rates.mean(axis=1))
+    assert np.allclose(wins.variance(), rates.var(axis=1, ddof=1))
+
+def test_merged_moments_per_protocol():
+    counts = np.random.default_rng(1).integers(0, 11, size=(2, 9)).astype(float)
+    wins = WinAggregator(2, 9, 10, mode=Aggregation.COUNTS)
+    wins.record(0, counts[:1, :4], protocol_indices=np.array([0]))
+    wins.record(0, counts[1:, :], protocol_indices=np.array([1]))
+    wins.record(4, counts[:1, 4:], protocol_indices=np.array([0]))
+    assert np.allclose(wins.variance(), (counts / 10).var(axis=1, ddof=1))
+
+def test_cache_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    config = {'num_honest': 10, 'protocols': ['pos']}
+    counts, chain_quality = np.arange(6.0).reshape(2, 3), np.array([0.1, 0.2, 0.3])
+    assert cache.lookup(config) is None
+    cache.store(config, counts, chain_quality)
+    cached_counts, cached_quality = cache.lookup(config)
+    assert np.array_equal(cached_counts, counts) and np.array_equal(cached_quality, chain_quality)
+    cache.store(config, counts[:, :2], chain_quality[:2])          # fewer episodes never replace an entry
+    assert cache.lookup(config)[0].shape == (2, 3)
+    assert cache.lookup(dict(config, num_honest=11)) is None
+
+def test_cached_experiment_extends_to_the_uncached_results(tmp_path):
+    def experiment(num_episodes, cache=None):
+        return SybilResiliencyExperiment(
+            20, 2, num_episodes, 30, protocols, coalition_size=2, seed=5, aggregation=Aggregation.COUNTS, cache=cache)
+    uncached = experiment(6).wins.counts
+    experiment(4, ResultCache(str(tmp_path)))
+    assert np.array_equal(experiment(6, ResultCache(str(tmp_path))).wins.counts, uncached)
+    assert np.array_equal(experiment(6, ResultCache(str(tmp_path))).wins.counts, uncached)
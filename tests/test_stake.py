@@ -0,0 +1,26 @@
+import numpy as np
+
+from stake import StakeSampler, group_sybils
+
+# The Fenwick-tree stake sampler: its sums after updates, and the frequencies of its draws.
+
+def test_updates_keep_the_sums():
+    rng = np.random.default_rng(0)
+    stakes = rng.uniform(1, 10, size=37)
+    sampler = StakeSampler(stakes, np.full(37, -1))
+    for _ in range(20):
+        indices, deltas = rng.integers(0, 37, size=5), rng.uniform(-0.5, 0.5, size=5)
+        np.add.at(stakes, indices, deltas)
+        sampler.update(indices, deltas)
+    assert np.allclose(sampler.stakes, stakes)
+    assert np.allclose([sampler._prefix(i) for i in range(38)], np.concatenate(([0.0], np.cumsum(stakes))))
+
+def test_draw_frequencies_follow_the_stakes():
+    rng = np.random.default_rng(1)
+    stakes = rng.pareto(1.5, size=100) + 0.01
+    sampler = StakeSampler(stakes, group_sybils(np.arange(100) >= 90, 2))
+    sampler.update(np.array([0, 50, 99]), np.array([5.0, 2.0, -0.005]))
+    probabilities = sampler.stakes / sampler.stakes.sum()
+    num_draws = 400000
+    frequencies = np.bincount(sampler.draw(num_draws, rng), minlength=100) / num_draws
+    assert np.all(np.abs(frequencies - probabilities) <= 5 * np.sqrt(probabilities * (1 - probabilities) / num_draws))